@@ -9,4 +9,22 @@
 __version__ = '1.0.0'
 __release__ = 'beta'
 __author__ = 'Andrew Gerard'
-__email__ = 'andrew@kinetifex.com'
\ No newline at end of file
+__email__ = 'andrew@kinetifex.com'
+
+
+import os as _os
+if _os.environ.get( 'IMPRESS_PROFILE' ):
+    # -- start the startup profiler before any tool modules are imported
+    from impress import profiler as _profiler
+
+
+def dispatch( key, *args, **kwargs ):
+    """
+    Invokes a registered command by key, eg: "myTools.performMyExample".
+
+    Runtime commands and menu items registered by impress call this, so Maya only
+    evaluates a short, constant statement. The command is found in a table of
+    registered commands, and its module is imported on first use if needed.
+    """
+    from impress import register
+    return register.dispatch( key, *args, **kwargs )
@@ -0,0 +1,87 @@
+"""
+Module for caching results of commands which are pure functions of their options.
+"""
+
+import time
+import array
+from collections import OrderedDict
+import callbacks
+
+
+def freeze( value ):
+    """Converts dicts, lists, sets and arrays of option values into hashable equivalents."""
+    if isinstance( value, dict ):
+        return tuple( sorted( ( k, freeze( v ) ) for k, v in value.iteritems() ) )
+    elif isinstance( value, ( list, tuple ) ):
+        return tuple( freeze( v ) for v in value )
+    elif isinstance( value, array.array ) or hasattr( value, 'tolist' ):
+        return freeze( value.tolist() )
+    elif isinstance( value, ( set, frozenset ) ):
+        return frozenset( freeze( v ) for v in value )
+    return value
+
+
+class ResultCache( object ):
+    """
+    Bounded least-recently-used cache of results, with optional maximum age in
+    seconds. The cache is cleared whenever one of the Maya `events` fires.
+    """
+
+    def __init__( self, size=32, age=None, events=callbacks.SCENE_EVENTS ):
+        self.size = size
+        self.age = age
+        self.events = events
+
+        self.hits = 0
+        self.misses = 0
+
+        self._items = OrderedDict()
+        self._watching = False
+
+
+    def __len__( self ):
+        return len( self._items )
+
+
+    def key( self, kwargs, fingerprint=None ):
+        """Builds a cache key from resolved kwargs and an optional scene-state fingerprint callable."""
+        if fingerprint is not None:
+            return ( freeze( kwargs ), freeze( fingerprint() ) )
+        return ( freeze( kwargs ), None )
+
+
+    def get( self, key ):
+        """Gets the cached result for key. Raises KeyError on a miss or expired entry."""
+        try:
+            stamp, result = self._items.pop( key )
+        except KeyError:
+            self.misses += 1
+            raise
+
+        if self.age is not None and time.time() - stamp > self.age:
+            self.misses += 1
+            raise KeyError( key )
+
+        # -- re-insert to mark as most recently used
+        self._items[key] = ( stamp, result )
+        self.hits += 1
+
+        return result
+
+
+    def store( self, key, result ):
+        """Stores result, evicting the least recently used entries beyond `size`."""
+        if not self._watching:
+            callbacks.onSceneChange( self.clear, self.events )
+            self._watching = True
+
+        self._items.pop( key, None )
+        self._items[key] = ( time.time(), result )
+
+        while len( self._items ) > self.size:
+            self._items.popitem( last=False )
+
+
+    def clear( self ):
+        """Removes all cached results."""
+        self._items.clear()
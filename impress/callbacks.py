@@ -0,0 +1,57 @@
+"""
+Module for sharing Maya script jobs between callbacks interested in scene changes.
+"""
+
+import maya.cmds as mc
+
+
+#: Events after which data queried from the scene should be considered stale.
+SCENE_EVENTS = ( 'SceneOpened', 'NewSceneOpened', 'SceneImported', 'DagObjectCreated',
+                 'NameChanged', 'renderLayerChange', 'renderLayerManagerChange', 'Undo', 'Redo' )
+
+
+_callbacks = {}
+_jobs = {}
+
+
+def _dispatch( event ):
+    for func in list( _callbacks.get( event, () ) ):
+        func()
+
+
+def addCallback( event, func ):
+    """Calls func whenever the Maya event fires. A single script job is shared per event."""
+
+    funcs = _callbacks.setdefault( event, [] )
+    if func not in funcs:
+        funcs.append( func )
+
+    if event not in _jobs:
+        _jobs[event] = mc.scriptJob( event=[event, lambda: _dispatch( event )] )
+
+
+def removeCallback( event, func ):
+    """Stops calling func for the Maya event, killing the script job when unused."""
+
+    funcs = _callbacks.get( event, [] )
+    if func in funcs:
+        funcs.remove( func )
+
+    if not funcs and event in _jobs:
+        job = _jobs.pop( event )
+        if mc.scriptJob( exists=job ):
+            mc.scriptJob( kill=job, force=True )
+
+
+def onSceneChange( func, events=SCENE_EVENTS ):
+    """Calls func after any of the scene change events."""
+
+    for event in events:
+        addCallback( event, func )
+
+
+def removeSceneChange( func, events=SCENE_EVENTS ):
+    """Removes a func previously added with `onSceneChange`."""
+
+    for event in events:
+        removeCallback( event, func )
@@ -0,0 +1,196 @@
+"""
+Module for running I/O-bound functions as coroutines without blocking Maya.
+
+Coroutines are generator functions. Each ``yield`` hands a blocking call, or a
+list of calls to overlap, to worker threads. The generator is resumed on Maya's
+main thread with the results, or with the exception raised by the call. Raise
+`Return` to finish with a value::
+
+    def fetchTextures( paths=() ):
+        datas = yield [ coroutines.call( download, path ) for path in paths ]
+        pm.mel.eval( 'print "fetched %d textures\\n"' % len( datas ) )
+        raise coroutines.Return( len( datas ) )
+
+Completions are marshalled back to the main thread through Maya's idle queue.
+In batch mode there is no idle queue, so `Task.wait` pumps them instead.
+"""
+
+import sys
+import inspect
+import traceback
+import Queue
+import maya.cmds as mc
+import maya.utils
+import utils
+
+
+_completions = Queue.Queue()
+_batch = None
+
+
+class Return( Exception ):
+    """Raised from a coroutine to finish with a value."""
+
+    def __init__( self, value=None ):
+        super( Return, self ).__init__( value )
+        self.value = value
+
+
+class Call( object ):
+    """A blocking call to run on a worker thread."""
+
+    def __init__( self, func, *args, **kwargs ):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+
+def call( func, *args, **kwargs ):
+    """Wraps a blocking call to be yielded from a coroutine."""
+    return Call( func, *args, **kwargs )
+
+
+def iscoroutinefunction( func ):
+    """Checks if func is a generator function which can be run as a coroutine."""
+    return inspect.isgeneratorfunction( func )
+
+
+def _runCall( item ):
+    try:
+        return True, item.func( *item.args, **item.kwargs )
+    except Exception:
+        return False, sys.exc_info()
+
+
+def _post( func, *args ):
+    """Queues func to be called on the main thread. Safe to call from worker threads."""
+    _completions.put( ( func, args ) )
+
+    if not _batch:
+        maya.utils.executeDeferred( _pump )
+
+
+def _pump( block=False ):
+    """Runs queued completions on the main thread."""
+    while True:
+        try:
+            func, args = _completions.get( block )
+        except Queue.Empty:
+            return
+        func( *args )
+        block = False
+
+
+class Task( object ):
+    """
+    A running coroutine, resumed on the main thread after each yielded call completes.
+    """
+
+    def __init__( self, generator, name=None ):
+        self.generator = generator
+        self.name = name or getattr( generator, '__name__', 'coroutine' )
+
+        self.done = False
+        self.result = None
+        self.exc_info = None
+
+        self._callbacks = []
+        self._waiting = False
+
+
+    def addDoneCallback( self, func ):
+        """Calls func with this task on the main thread once it finishes."""
+        if self.done:
+            func( self )
+        else:
+            self._callbacks.append( func )
+
+
+    def _step( self, ok=True, value=None ):
+        try:
+            if ok:
+                item = self.generator.send( value )
+            else:
+                item = self.generator.throw( *value )
+        except ( StopIteration, Return ), e:
+            self._finish( getattr( e, 'value', None ), None )
+            return
+        except Exception:
+            self._finish( None, sys.exc_info() )
+            return
+
+        self._submit( item )
+
+
+    def _submit( self, item ):
+        pool = utils.threadPool()
+
+        if isinstance( item, ( list, tuple ) ):
+            calls = [ i if isinstance( i, Call ) else Call( i ) for i in item ]
+            results = [None] * len( calls )
+            pending = [len( calls )]
+
+            if not calls:
+                _post( self._step, True, [] )
+                return
+
+            def gathered( index, outcome ):
+                results[index] = outcome
+                pending[0] -= 1
+                if pending[0] == 0:
+                    for ok, value in results:
+                        if not ok:
+                            self._step( False, value )
+                            return
+                    self._step( True, [ value for ok, value in results ] )
+
+            for index, c in enumerate( calls ):
+                pool.apply_async( _runCall, ( c, ),
+                                  callback=lambda outcome, index=index: _post( gathered, index, outcome ) )
+        else:
+            if not isinstance( item, Call ):
+                item = Call( item )
+            pool.apply_async( _runCall, ( item, ),
+                              callback=lambda outcome: _post( self._step, *outcome ) )
+
+
+    def _finish( self, result, exc_info ):
+        self.done = True
+        self.result = result
+        self.exc_info = exc_info
+
+        if exc_info is not None and not self._callbacks and not self._waiting:
+            mc.warning( "Coroutine '%s' failed." % self.name )
+            traceback.print_exception( *exc_info )
+
+        for func in self._callbacks:
+            func( self )
+        self._callbacks = []
+
+
+    def wait( self ):
+        """
+        Blocks until the task finishes, running completions on the calling
+        thread. Returns the result, or re-raises the task's exception.
+        """
+        self._waiting = True
+        while not self.done:
+            _pump( block=True )
+
+        if self.exc_info is not None:
+            raise self.exc_info[0], self.exc_info[1], self.exc_info[2]
+
+        return self.result
+
+
+def run( func, *args, **kwargs ):
+    """Starts a coroutine function on the main thread and returns its `Task`."""
+    global _batch
+
+    if _batch is None:
+        _batch = mc.about( batch=True )
+
+    task = Task( func( *args, **kwargs ), getattr( func, '__name__', None ) )
+    task._step()
+
+    return task
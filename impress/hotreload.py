@@ -0,0 +1,164 @@
+"""
+Module for reloading tool modules without restarting Maya.
+
+Reloading a module with `reload` re-runs its `PerformCommand` construction,
+leaving menus, pipelines and open option boxes bound to the old objects. The
+`reload` function of this module instead swaps the new definitions into the
+existing command objects, edits only the runtime commands whose registration
+changed, and rebuilds open views only if their model's fields changed::
+
+    from impress import hotreload
+    hotreload.reload( 'myTools.transforms' )
+
+Option values are stored by field name, so they are kept across reloads.
+"""
+
+import sys
+import __builtin__
+import pymel.core as pm
+import models
+import register
+import specs
+import layers
+import storage
+import views
+
+
+def _moduleCommands( module ):
+    prefix = module.__name__ + '.'
+    found = dict( ( key, command ) for key, command in register.commands.iteritems() if key.startswith( prefix ) )
+
+    for value in module.__dict__.itervalues():
+        if isinstance( value, register.RuntimeCommand ):
+            found.setdefault( value.key, value )
+
+    return found
+
+
+def _moduleModels( module ):
+    return dict( ( name, value ) for name, value in module.__dict__.iteritems()
+                 if isinstance( value, type ) and issubclass( value, models.OptionModel )
+                 and value.__module__ == module.__name__ )
+
+
+def _signature( model ):
+    """Gets a comparable description of the controls a model's view would build."""
+    fields = []
+    for spec in specs.compileSpec( model ).fields:
+        field = spec.field
+        requires = spec.requires and ( spec.requires[0].name, repr( spec.requires[1] ) )
+        fields.append( ( spec.name, field.__class__, spec.label, repr( getattr( field, 'default', None ) ),
+                         repr( sorted( spec.widget_kwargs.iteritems() ) ), requires ) )
+
+    spec = specs.compileSpec( model )
+    return ( spec.title, spec.button_label, tuple( fields ) )
+
+
+def _forgetModel( model ):
+    specs._specs.pop( model, None )
+    layers.invalidate( model )
+    storage._stores.pop( model, None )
+    models._model_subscribers.pop( model, None )
+
+
+def _updateRuntimes( old_runtimes, command ):
+    old_runtimes = dict( old_runtimes )
+
+    for name, kwargs in command.runtimeCommands():
+        if name not in old_runtimes or not pm.runTimeCommand( name, exists=1 ):
+            continue
+        if old_runtimes[name] != kwargs:
+            try:
+                pm.runTimeCommand( name, edit=True, **kwargs )
+                print "# Updated runtime:", name
+            except RuntimeError, e:
+                pm.mel.warning( "Could not update runtime command '%s': %s" % ( name, e ) )
+
+
+def _rebindView( view, old_model, new_model ):
+    """Moves a view's controls onto the new model's fields, or rebuilds it if the fields changed."""
+    command = getattr( view, 'command', None )
+    if command is not None and isinstance( getattr( command, 'optionmodel', None ), new_model ):
+        new_instance = command.optionmodel
+    else:
+        new_instance = new_model()
+
+    if _signature( old_model ) == _signature( new_model ):
+        new_fields = dict( ( field.name, field ) for field in new_instance.fields )
+        for field in view.optionmodel.fields:
+            new_field = new_fields.get( field.name )
+            if new_field is not None:
+                for attr in field._widget_attrs:
+                    if attr in field.__dict__:
+                        new_field.__dict__[attr] = field.__dict__[attr]
+
+        view.optionmodel = new_instance
+        view.spec = specs.compileSpec( new_instance )
+        return view
+
+    # -- controls changed, so build a new view in place of the old one
+    parent = getattr( view, 'parent', None )
+    view.hide()
+
+    new_view = view.__class__( new_instance, command )
+    if parent is not None:
+        new_view.parent = parent
+    new_view.show()
+    return new_view
+
+
+def reload( module ):
+    """
+    Reloads a module, by name or object, updating its registered commands and
+    open views in place. Returns the reloaded module.
+    """
+    if isinstance( module, basestring ):
+        __import__( module )
+        module = sys.modules[module]
+
+    old_commands = _moduleCommands( module )
+    old_runtimes = dict( ( key, command.runtimeCommands() ) for key, command in old_commands.iteritems() )
+    old_models = _moduleModels( module )
+
+    # -- unsaved option values are flushed so the new models read them back
+    storage.flushAll()
+
+    module = __builtin__.reload( module )
+
+    new_commands = _moduleCommands( module )
+    new_models = _moduleModels( module )
+
+    for key, old in old_commands.iteritems():
+        new = new_commands.get( key )
+        if new is None:
+            register.commands.pop( key, None )
+            print "# Removed command:", key
+            continue
+
+        # -- keep the old object, which menus and pipelines may hold on to
+        if new is not old:
+            old.__class__ = new.__class__
+            old.__dict__.clear()
+            old.__dict__.update( new.__dict__ )
+
+            register.commands[key] = old
+            for name, value in module.__dict__.items():
+                if value is new:
+                    setattr( module, name, old )
+
+        _updateRuntimes( old_runtimes[key], old )
+
+    for view in list( views._live_views ):
+        if view.optionmodel is None:
+            continue
+
+        old_model = view.optionmodel.__class__
+        new_model = new_models.get( old_model.__name__ )
+        if old_models.get( old_model.__name__ ) is old_model and new_model is not None and new_model is not old_model:
+            _rebindView( view, old_model, new_model )
+
+    for name, model in old_models.iteritems():
+        if new_models.get( name ) is not model:
+            _forgetModel( model )
+
+    return module
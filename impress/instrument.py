@@ -0,0 +1,233 @@
+"""
+Module for counting the Maya commands issued by impress.
+
+When enabled, the functions of ``maya.cmds`` and ``pymel.core``, the item
+access of ``pm.optionVar``, and the `widget_command` of every field class, are
+wrapped to count calls. Calls made
+by a Maya command itself, such as pymel calling ``maya.cmds``, are not counted
+again, so counts are of round-trips issued by impress and tool code.
+
+Counts are grouped by operation. Showing an option box, handling a field's
+change command, updating widgets, resolving a command's kwargs and registering
+runtime commands are operations already, and more can be labelled with
+`operation`. `budget` asserts that a block stays within a number of calls::
+
+    with instrument.budget( 6 ):
+        view._onFieldChange()
+
+Instrumentation is meant for development and tests, and adds overhead to
+every Maya command while enabled.
+"""
+
+import types
+import threading
+from contextlib import contextmanager
+import maya.cmds as mc
+import pymel.core as pm
+import models
+import ui
+import views
+import register
+
+
+#: Methods recorded as operations, as (class, method name, operation label).
+OPERATIONS = (
+    ( views.OptionBoxView, 'show', 'OptionBoxView.show' ),
+    ( views.BaseView, '_onFieldChange', 'changeCommand' ),
+    ( views.OptionBoxView, '_onFieldChange', 'changeCommand' ),
+    ( views.BaseView, '_updateWidgets', 'updateWidgets' ),
+    ( register.PerformCommand, '_get_kwargs', 'getKwargs' ),
+    ( register.RuntimeCommand, 'register', 'register' ),
+)
+
+
+class _State( threading.local ):
+
+    def __init__( self ):
+        self.depth = 0
+        self.labels = []
+
+
+_state = _State()
+_patched = None
+_missing = object()
+
+_totals = {}
+_counts = {}
+_runs = {}
+
+
+def _count( name ):
+    _totals[name] = _totals.get( name, 0 ) + 1
+
+    for label in _state.labels:
+        calls = _counts.setdefault( label, {} )
+        calls[name] = calls.get( name, 0 ) + 1
+
+
+def _wrapCommand( func, name ):
+
+    def wrapper( *args, **kwargs ):
+        if _state.depth:
+            return func( *args, **kwargs )
+
+        _count( name )
+        _state.depth += 1
+        try:
+            return func( *args, **kwargs )
+        finally:
+            _state.depth -= 1
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = func.__doc__
+    wrapper._instrumented = func
+    return wrapper
+
+
+def _wrapOperation( func, label ):
+
+    def wrapper( *args, **kwargs ):
+        with operation( label ):
+            return func( *args, **kwargs )
+
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+def _fieldClasses( cls=models.Field ):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        for nested in _fieldClasses( subclass ):
+            yield nested
+
+
+def _patch( owner, attr, value ):
+    # -- inherited class attributes are deleted again, rather than copied onto the class
+    original = owner.__dict__.get( attr, _missing ) if isinstance( owner, type ) else getattr( owner, attr )
+    _patched.append( ( owner, attr, original ) )
+    setattr( owner, attr, value )
+
+
+def isEnabled():
+    return _patched is not None
+
+
+def enable():
+    """Starts counting Maya commands."""
+    global _patched
+
+    if _patched is not None:
+        return
+
+    _patched = []
+
+    for module in ( mc, pm ):
+        for name, func in module.__dict__.items():
+            if name.startswith( '_' ) or not isinstance( func, ( types.FunctionType, types.BuiltinFunctionType ) ):
+                continue
+            _patch( module, name, _wrapCommand( func, name ) )
+
+    # -- pm.optionVar is a dict-like object, each item access being an optionVar call
+    optionvars = type( pm.optionVar )
+    for attr in ( '__contains__', '__getitem__', '__setitem__', '__delitem__' ):
+        func = getattr( optionvars, attr, None )
+        if func is not None:
+            _patch( optionvars, attr, _wrapCommand( func, 'optionVar' ) )
+
+    ui_functions = [ func for func in ui.__dict__.itervalues() if isinstance( func, types.FunctionType ) ]
+
+    for cls in set( _fieldClasses() ):
+        if 'widget_command' in cls.__dict__:
+            func = cls.__dict__['widget_command'].__get__( None, cls )
+            # -- impress controls are counted by the commands they issue
+            if func not in ui_functions:
+                name = getattr( func, '__name__', cls.__name__ )
+                _patch( cls, 'widget_command', staticmethod( _wrapCommand( func, name ) ) )
+
+    for cls, name, label in OPERATIONS:
+        _patch( cls, name, _wrapOperation( cls.__dict__[name], label ) )
+
+
+def disable():
+    """Stops counting, restoring the original functions."""
+    global _patched
+
+    if _patched is None:
+        return
+
+    for owner, attr, original in reversed( _patched ):
+        if original is _missing:
+            delattr( owner, attr )
+        else:
+            setattr( owner, attr, original )
+
+    _patched = None
+
+
+def reset():
+    """Clears all counts."""
+    _totals.clear()
+    _counts.clear()
+    _runs.clear()
+
+
+@contextmanager
+def operation( label ):
+    """Counts the Maya commands issued inside the block under label, as well as any enclosing operations."""
+    if label in _state.labels:
+        yield
+        return
+
+    _runs[label] = _runs.get( label, 0 ) + 1
+    _state.labels.append( label )
+    try:
+        yield
+    finally:
+        _state.labels.remove( label )
+
+
+def counts( label=None ):
+    """Gets a dict of Maya command name to call count, of one operation or of all calls."""
+    if label is None:
+        return dict( _totals )
+    return dict( _counts.get( label, {} ) )
+
+
+def report():
+    """Prints the Maya calls per run of each operation."""
+    print '# %-30s %8s %12s  %s' % ( 'operation', 'runs', 'calls/run', 'most called' )
+
+    for label in sorted( _runs ):
+        calls = _counts.get( label, {} )
+        total = sum( calls.itervalues() )
+        top = ', '.join( '%s:%d' % item for item in sorted( calls.iteritems(), key=lambda item: -item[1] )[:3] )
+        print '# %-30s %8d %12.1f  %s' % ( label, _runs[label], float( total ) / _runs[label], top )
+
+
+@contextmanager
+def budget( limit, label='budget' ):
+    """
+    Asserts that the block issues at most `limit` Maya commands, raising
+    AssertionError with the commands called if it exceeds it. Enables counting
+    for the duration of the block if needed.
+    """
+    enabled = isEnabled()
+    if not enabled:
+        enable()
+
+    before = counts( label )
+    try:
+        with operation( label ):
+            yield
+    finally:
+        if not enabled:
+            disable()
+
+    after = counts( label )
+    calls = dict( ( name, n - before.get( name, 0 ) ) for name, n in after.iteritems() if n > before.get( name, 0 ) )
+    total = sum( calls.itervalues() )
+
+    if total > limit:
+        detail = ', '.join( '%s:%d' % item for item in sorted( calls.iteritems(), key=lambda item: -item[1] ) )
+        raise AssertionError( "%s issued %d Maya commands, over its budget of %d (%s)" % ( label, total, limit, detail ) )
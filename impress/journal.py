@@ -0,0 +1,202 @@
+"""
+Module for logging command invocations and replaying them as benchmarks.
+
+When enabled, every `RuntimeCommand` or `PerformCommand` invocation appends one
+compact json line to the journal, holding the command key, resolved args and
+kwargs, a timestamp, the duration and the outcome. A journal recorded from real
+artist sessions can be replayed in batch to compare timings against the
+recorded ones. Arrays and `MObjectHandle` values are journaled in a form
+replay restores, and entries holding other values json cannot store are marked
+unreplayable::
+
+    mayapy -c "import maya.standalone; maya.standalone.initialize(); \\
+               from impress import journal; journal.replay( 'journal.log', scene='shot.ma' )"
+"""
+
+import os
+import sys
+import json
+import time
+import array
+from timeit import default_timer as _timer
+import maya.cmds as mc
+import register
+import selection
+
+
+_file = None
+
+
+def defaultPath():
+    """Gets the default journal path in the user's app directory."""
+    return os.path.join( mc.internalVar( userAppDir=True ), 'impress', 'journal.log' )
+
+
+def _encode( value ):
+    """Converts values json cannot store into tagged dicts `_decode` restores, or raises TypeError."""
+    if isinstance( value, array.array ):
+        return { '__array__': value.typecode, 'v': value.tolist() }
+    if hasattr( value, 'dtype' ) and hasattr( value, 'tolist' ):
+        return { '__ndarray__': str( value.dtype ), 'v': value.tolist() }
+    if hasattr( value, 'isValid' ) and hasattr( value, 'object' ):
+        try:
+            return { '__node__': selection.handleName( value ) }
+        except ValueError:
+            pass
+    raise TypeError( "%r is not journalable" % ( value, ) )
+
+
+def _encodeOrRepr( value ):
+    try:
+        return _encode( value )
+    except TypeError:
+        return repr( value )
+
+
+def _decode( value ):
+    """Restores values tagged by `_encode`, raising ValueError for nodes missing from the scene."""
+    if isinstance( value, list ):
+        return [ _decode( v ) for v in value ]
+    if not isinstance( value, dict ):
+        return value
+
+    if '__array__' in value:
+        return array.array( str( value['__array__'] ), value['v'] )
+    if '__ndarray__' in value:
+        import numpy
+        return numpy.asarray( value['v'], dtype=value['__ndarray__'] )
+    if '__node__' in value:
+        handles = selection.resolve( selection.nodesSource( [value['__node__']] ), handles=True )
+        if not handles:
+            raise ValueError( "node '%s' does not exist" % value['__node__'] )
+        return handles[0]
+
+    return dict( ( k, _decode( v ) ) for k, v in value.iteritems() )
+
+
+def _record( command, args, kwargs, duration, exc_info ):
+    entry = {
+        'c': command.key,
+        't': round( time.time(), 3 ),
+        'd': round( duration, 6 ),
+    }
+    if args:
+        entry['a'] = args
+    if kwargs:
+        entry['k'] = kwargs
+    if exc_info is not None:
+        entry['e'] = '%s: %s' % ( exc_info[0].__name__, exc_info[1] )
+
+    try:
+        line = json.dumps( entry, separators=( ',', ':' ), default=_encode )
+    except TypeError:
+        # -- kept for its timing, but replay cannot reconstruct the arguments
+        entry['u'] = 1
+        line = json.dumps( entry, separators=( ',', ':' ), default=_encodeOrRepr )
+
+    _file.write( line + '\n' )
+    _file.flush()
+
+
+def enable( path=None ):
+    """Starts appending invocations to the journal at path."""
+    global _file
+
+    disable()
+
+    if path is None:
+        path = defaultPath()
+
+    directory = os.path.dirname( path )
+    if directory and not os.path.isdir( directory ):
+        os.makedirs( directory )
+
+    _file = open( path, 'a' )
+    register.addInvokeCallback( _record )
+
+
+def disable():
+    """Stops journaling."""
+    global _file
+
+    register.removeInvokeCallback( _record )
+
+    if _file is not None:
+        _file.close()
+        _file = None
+
+
+def isEnabled():
+    return _file is not None
+
+
+def read( path=None ):
+    """Yields the entries of a journal as dicts, skipping truncated lines."""
+    if path is None:
+        path = defaultPath()
+
+    with open( path, 'r' ) as f:
+        for line in f:
+            try:
+                yield json.loads( line )
+            except ValueError:
+                continue
+
+
+def replay( path=None, scene=None, commands=None, verbose=True ):
+    """
+    Re-executes the entries of a journal, optionally opening `scene` first, and
+    limited to a list of command keys. Entries which failed when recorded, or
+    are marked unreplayable, are skipped. Returns a dict of command key to lists of (recorded, replayed)
+    durations, and prints a summary.
+    """
+    if scene is not None:
+        mc.file( scene, open=True, force=True )
+
+    timings = {}
+
+    for entry in read( path ):
+        key = entry['c']
+        if 'e' in entry or 'u' in entry or ( commands is not None and key not in commands ):
+            continue
+
+        try:
+            command = register.getCommand( key )
+        except ( ImportError, KeyError ):
+            sys.stderr.write( "# Replay: skipping unknown command '%s'\n" % key )
+            continue
+
+        try:
+            args = _decode( entry.get( 'a', [] ) )
+            kwargs = dict( ( str( k ), _decode( v ) ) for k, v in entry.get( 'k', {} ).iteritems() )
+        except ValueError, e:
+            sys.stderr.write( "# Replay: skipping %s: %s\n" % ( key, e ) )
+            continue
+
+        start = _timer()
+        try:
+            command._call( *args, **kwargs )
+        except Exception, e:
+            sys.stderr.write( "# Replay: %s failed: %s\n" % ( key, e ) )
+            continue
+        duration = _timer() - start
+
+        timings.setdefault( key, [] ).append( ( entry['d'], duration ) )
+
+    if verbose:
+        printSummary( timings )
+
+    return timings
+
+
+def printSummary( timings ):
+    """Prints the count, mean recorded and replayed durations, and ratio per command."""
+    print '# %-50s %6s %12s %12s %8s' % ( 'command', 'count', 'recorded', 'replayed', 'ratio' )
+
+    for key in sorted( timings ):
+        pairs = timings[key]
+        recorded = sum( p[0] for p in pairs ) / len( pairs )
+        replayed = sum( p[1] for p in pairs ) / len( pairs )
+        ratio = replayed / recorded if recorded else 0.0
+
+        print '# %-50s %6d %11.4fs %11.4fs %7.2fx' % ( key, len( pairs ), recorded, replayed, ratio )
@@ -0,0 +1,142 @@
+"""
+Module for resolving option values through layers of settings.
+
+Each option field of a model resolves to the value of the highest layer which
+sets it, from lowest to highest:
+
+- the field default.
+- the model's studio preset, named by ``Meta.studio_preset`` in the studio library.
+- the user's stored option.
+- a per-scene override, stored on a network node in the scene.
+- explicit kwargs passed to the call.
+
+The first four layers are merged once per model and cached, so resolving does
+not walk every layer of every field. The cache of a model is invalidated when
+its options change, when its scene overrides are set, on scene open and undo,
+or when the studio library changes.
+"""
+
+import json
+import maya.cmds as mc
+import callbacks
+import library
+
+
+SCENE_NODE = 'impressSceneOptions'
+
+#: Events after which scene overrides may have changed.
+SCENE_EVENTS = ( 'SceneOpened', 'NewSceneOpened', 'SceneImported', 'Undo', 'Redo' )
+
+_merged = {}
+_subscribed = set()
+
+
+def _modelClass( model ):
+    return model if isinstance( model, type ) else model.__class__
+
+
+def invalidate( model=None ):
+    """Drops the merged values of a model, or of all models."""
+    if model is None:
+        _merged.clear()
+    else:
+        _merged.pop( _modelClass( model ), None )
+
+
+def _onSceneChange():
+    _merged.clear()
+
+
+# -- scene overrides
+
+def sceneOverrides( model ):
+    """Gets the dict of values overridden for a model in the current scene."""
+    attr = '%s.%s' % ( SCENE_NODE, _modelClass( model ).__name__ )
+
+    if not mc.objExists( attr ):
+        return {}
+
+    try:
+        return json.loads( mc.getAttr( attr ) or '{}' )
+    except ValueError:
+        mc.warning( "Invalid scene overrides on %s, ignoring." % attr )
+        return {}
+
+
+def setSceneOverrides( model, values ):
+    """Stores a dict of values overriding a model's options in the current scene. An empty dict clears them."""
+    model = _modelClass( model )
+    attr = model.__name__
+
+    if not mc.objExists( SCENE_NODE ):
+        if not values:
+            return
+        mc.createNode( 'network', name=SCENE_NODE, skipSelect=True )
+
+    if not mc.attributeQuery( attr, node=SCENE_NODE, exists=True ):
+        mc.addAttr( SCENE_NODE, longName=attr, dataType='string' )
+
+    mc.setAttr( '%s.%s' % ( SCENE_NODE, attr ), json.dumps( values, separators=( ',', ':' ) ), type='string' )
+    invalidate( model )
+
+
+# -- resolution
+
+def _studioPreset( model ):
+    name = getattr( model.Meta, 'studio_preset', None )
+    studio = library.getLibrary()
+
+    if name is None or studio is None:
+        return {}
+
+    try:
+        return studio.getPreset( model.__name__, name )
+    except KeyError:
+        return {}
+
+
+def _merge( model ):
+    fields = [ field for field in model.__dict__.itervalues() if hasattr( field, 'get' ) and field.name is not None ]
+
+    values = dict( ( field.name, field.getDefault() ) for field in fields )
+
+    studio = _studioPreset( model )
+    values.update( ( k, v ) for k, v in studio.iteritems() if k in values )
+
+    for field in fields:
+        if field.isStored():
+            values[field.name] = field.get()
+
+    scene = sceneOverrides( model )
+    values.update( ( k, v ) for k, v in scene.iteritems() if k in values )
+
+    return values
+
+
+def resolve( model, **overrides ):
+    """
+    Gets a dict of the resolved value of each option field of a model, with any
+    supplied kwargs taking precedence.
+    """
+    model = _modelClass( model )
+
+    if model not in _subscribed:
+        _subscribed.add( model )
+        model.subscribe( lambda changes: invalidate( model ) )
+        for event in SCENE_EVENTS:
+            callbacks.addCallback( event, _onSceneChange )
+
+    studio = library.getLibrary()
+
+    try:
+        cached_studio, values = _merged[model]
+        if cached_studio is not studio:
+            raise KeyError( model )
+    except KeyError:
+        values = _merge( model )
+        _merged[model] = ( studio, values )
+
+    values = dict( values )
+    values.update( overrides )
+
+    return values
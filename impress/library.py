@@ -0,0 +1,244 @@
+"""
+Module for reading studio-wide option presets from a shared library.
+
+A library is a directory, usually on a shared volume, holding one json file of
+presets per option model, plus an index of the models and their preset names::
+
+    <library>/index.json
+    <library>/<ModelName>.json
+
+Each session keeps a local on-disk cache of the files it has read. Cached
+presets are revalidated against the library file's mtime and size the first time
+a model is looked up, so startup does not re-read or re-parse the whole library.
+"""
+
+import os
+import json
+import tempfile
+import hashlib
+import cPickle as pickle
+import maya.cmds as mc
+import scheduler
+
+
+#: Environment variable holding the path of the default studio library.
+LIBRARY_ENV = 'IMPRESS_PRESET_LIBRARY'
+
+#: Environment variable overriding the local cache directory.
+CACHE_ENV = 'IMPRESS_CACHE_DIR'
+
+_CACHE_VERSION = 1
+
+_library = None
+
+_umask = os.umask( 0 )
+os.umask( _umask )
+
+
+def _cacheDir():
+    path = os.environ.get( CACHE_ENV )
+    if not path:
+        path = os.path.join( mc.internalVar( userAppDir=True ), 'impress', 'cache' )
+    return path
+
+
+def _stat( path ):
+    try:
+        st = os.stat( path )
+    except OSError:
+        return None
+    return ( st.st_mtime, st.st_size )
+
+
+def _writeFile( path, data ):
+    """
+    Writes data through a uniquely named temporary file renamed over path, so
+    readers see either the old or the new file, never a partial or missing one.
+    """
+    fd, tmp_path = tempfile.mkstemp( prefix=os.path.basename( path ) + '.', suffix='.tmp',
+                                     dir=os.path.dirname( path ) or '.' )
+    try:
+        with os.fdopen( fd, 'wb' ) as f:
+            f.write( data )
+
+        # -- mkstemp files are private, library files are shared
+        try:
+            mode = os.stat( path ).st_mode & 0777
+        except OSError:
+            mode = 0666 & ~_umask
+        os.chmod( tmp_path, mode )
+
+        if os.name == 'nt' and os.path.exists( path ):
+            # -- windows cannot rename over an existing file
+            os.remove( path )
+        os.rename( tmp_path, path )
+    except:
+        if os.path.exists( tmp_path ):
+            os.remove( tmp_path )
+        raise
+
+
+def _writeJson( path, data ):
+    _writeFile( path, json.dumps( data, indent=1, sort_keys=True ) )
+
+
+class PresetLibrary( object ):
+    """
+    Read-mostly repository of presets keyed by model name and preset name.
+    """
+
+    def __init__( self, root, cache_path=None ):
+        self.root = os.path.normpath( root )
+
+        if cache_path is None:
+            key = hashlib.md5( self.root.replace( '\\', '/' ).lower() ).hexdigest()[:12]
+            cache_path = os.path.join( _cacheDir(), 'library_%s.cache' % key )
+        self.cache_path = cache_path
+
+        self._entries = None
+        self._validated = set()
+        self._dirty = False
+
+
+    def _modelPath( self, model_name ):
+        return os.path.join( self.root, '%s.json' % model_name )
+
+
+    def _loadCache( self ):
+        if self._entries is None:
+            try:
+                with open( self.cache_path, 'rb' ) as f:
+                    version, entries = pickle.load( f )
+                if version != _CACHE_VERSION:
+                    entries = {}
+            except ( IOError, EOFError, ValueError, pickle.UnpicklingError ):
+                entries = {}
+
+            self._entries = entries
+
+        return self._entries
+
+
+    def saveCache( self ):
+        """Writes the local cache if any model was re-read from the library."""
+        if not self._dirty:
+            return
+
+        directory = os.path.dirname( self.cache_path )
+        if not os.path.isdir( directory ):
+            os.makedirs( directory )
+
+        _writeFile( self.cache_path, pickle.dumps( ( _CACHE_VERSION, self._entries ), pickle.HIGHEST_PROTOCOL ) )
+
+        self._dirty = False
+
+
+    def _markDirty( self ):
+        if not self._dirty:
+            self._dirty = True
+            scheduler.schedule( self.saveCache, scheduler.LOW, name='library.saveCache' )
+
+
+    def _presetsOf( self, model_name ):
+        entries = self._loadCache()
+
+        if model_name not in self._validated:
+            path = self._modelPath( model_name )
+            stamp = _stat( path )
+            cached = entries.get( model_name )
+
+            if stamp is None:
+                # -- missing files are not cached, so they are found once published
+                if entries.pop( model_name, None ) is not None:
+                    self._markDirty()
+                return {}
+
+            if cached is None or cached[0] != stamp:
+                try:
+                    with open( path, 'rb' ) as f:
+                        presets = json.load( f )
+                except ( IOError, ValueError ), e:
+                    # -- corrupt or half written files are read again on the next lookup
+                    mc.warning( "Could not read presets from %s (%s)." % ( path, e ) )
+                    return cached[1] if cached is not None else {}
+
+                entries[model_name] = ( stamp, presets )
+                self._markDirty()
+
+            self._validated.add( model_name )
+
+        return entries[model_name][1]
+
+
+    def presets( self, model_name ):
+        """Gets a sorted list of the preset names available to a model."""
+        return sorted( self._presetsOf( model_name ).keys() )
+
+
+    def getPreset( self, model_name, name ):
+        """Gets the stored dict of values of a preset. Raises KeyError if not found."""
+        return self._presetsOf( model_name )[name]
+
+
+    def hasPreset( self, model_name, name ):
+        return name in self._presetsOf( model_name )
+
+
+    def invalidate( self, model_name=None ):
+        """Forces models to be revalidated against the library on next lookup."""
+        if model_name is None:
+            self._validated.clear()
+        else:
+            self._validated.discard( model_name )
+
+
+    def models( self ):
+        """Gets the model names listed in the library index."""
+        try:
+            with open( os.path.join( self.root, 'index.json' ), 'rb' ) as f:
+                return sorted( json.load( f ).keys() )
+        except ( IOError, ValueError ):
+            return []
+
+
+    def publish( self, model_name, name, values ):
+        """Writes a preset to the library and updates the index."""
+        self.invalidate( model_name )
+        presets = dict( self._presetsOf( model_name ) )
+        presets[name] = values
+
+        _writeJson( self._modelPath( model_name ), presets )
+
+        index_path = os.path.join( self.root, 'index.json' )
+        try:
+            with open( index_path, 'rb' ) as f:
+                index = json.load( f )
+        except ( IOError, ValueError ):
+            index = {}
+
+        index[model_name] = sorted( presets.keys() )
+        _writeJson( index_path, index )
+
+        self.invalidate( model_name )
+
+
+def getLibrary():
+    """Gets the studio library set with `setLibrary` or the IMPRESS_PRESET_LIBRARY environment variable."""
+    global _library
+
+    if _library is None:
+        root = os.environ.get( LIBRARY_ENV )
+        if root:
+            _library = PresetLibrary( root )
+
+    return _library
+
+
+def setLibrary( library ):
+    """Sets the studio library, as a `PresetLibrary` or path. None disables it."""
+    global _library
+
+    if library is not None and not isinstance( library, PresetLibrary ):
+        library = PresetLibrary( library )
+
+    _library = library
@@ -3,10 +3,21 @@ Module for defining models to organize the data and options to be tracked.
 """
 
 import itertools
+import json
+from contextlib import contextmanager
+import array
+import base64
 import maya.cmds as mc
 import pymel.core as pm
 import utils
 import ui
+import callbacks
+import library
+import layers
+import selection
+import storage
+import scheduler
+import profiler
 
 
 class Model( object ):
@@ -17,6 +28,7 @@ class Model( object ):
     class Meta:
         pass
 
+    @profiler.traced( 'model' )
     def __init__( self ):
         self.fields = []
 
@@ -25,6 +37,7 @@ class Model( object ):
             if isinstance( field, Field ):
                 if field.name is None:
                     field.name = name
+                field.model = self.__class__
 
                 self.fields.append( field )
 
@@ -35,8 +48,23 @@ class Model( object ):
 class OptionModel( Model ):
     """
     Used to setup fields that have stored optionVar settings.
+
+    Named presets of field values can be saved, listed and applied. All presets
+    of a model are stored together in a single optionVar, as values which
+    differ from the field defaults.
+
+    Subscribers are notified after option values change, with a dict of field
+    name to (old, new) values. Changes made inside a `transaction` are
+    delivered together when it ends.
     """
 
+    def __init__( self ):
+        super( OptionModel, self ).__init__()
+
+        self.option_fields = [ field for field in self.fields if hasattr( field, 'get' ) ]
+        self._presets = None
+
+
     def preApply( self ):
         """
         Must return a dict of kwargs which will be passed to function.
@@ -45,6 +73,207 @@ class OptionModel( Model ):
         return {}
 
 
+    def getValues( self ):
+        """Gets a dict of the current value of each option field."""
+        return dict( ( field.name, field.get() ) for field in self.option_fields )
+
+
+    def resolve( self, **overrides ):
+        """
+        Gets a dict of option values resolved through the studio preset, user
+        options and scene overrides, with supplied kwargs taking precedence.
+        See `layers`.
+        """
+        return layers.resolve( self, **overrides )
+
+
+    def setValues( self, values ):
+        """
+        Sets option fields from a dict of values, writing only the fields whose
+        value changed. Returns the names of the changed fields.
+        """
+        changed = []
+
+        with transaction():
+            for field in self.option_fields:
+                if field.name in values:
+                    value = values[field.name]
+                    if _normalize( value ) != _normalize( field.get() ):
+                        field.set( value )
+                        changed.append( field.name )
+
+        return changed
+
+
+    # -- notifications
+
+    @classmethod
+    def subscribe( cls, callback ):
+        """Calls callback( changes ) after option values of this model change."""
+        for name, field in cls.__dict__.iteritems():
+            if isinstance( field, Field ):
+                if field.name is None:
+                    field.name = name
+                field.model = cls
+
+        _model_subscribers.setdefault( cls, [] ).append( callback )
+
+
+    @classmethod
+    def unsubscribe( cls, callback ):
+        subscribers = _model_subscribers.get( cls, [] )
+        if callback in subscribers:
+            subscribers.remove( callback )
+
+
+    @staticmethod
+    def transaction():
+        """Context manager batching change notifications until it exits."""
+        return transaction()
+
+
+    # -- presets
+
+    @property
+    def presets_varname( self ):
+        return "%s_presets" % self.__class__.__name__
+
+
+    def _loadPresets( self ):
+        if self._presets is None:
+            try:
+                self._presets = json.loads( pm.optionVar[ self.presets_varname ] )
+            except KeyError:
+                self._presets = {}
+
+        return self._presets
+
+
+    def _storePresets( self ):
+        pm.optionVar[ self.presets_varname ] = json.dumps( self._presets, separators=( ',', ':' ) )
+
+
+    def presets( self ):
+        """Gets a sorted list of saved preset names."""
+        return sorted( self._loadPresets().keys() )
+
+
+    def studioPresets( self ):
+        """Gets a sorted list of preset names available from the studio library."""
+        studio = library.getLibrary()
+        if studio is None:
+            return []
+        return studio.presets( self.__class__.__name__ )
+
+
+    def getPreset( self, name ):
+        """
+        Gets a dict of field values for the named preset, filled in with defaults.
+        User presets take precedence over studio library presets of the same name.
+        """
+        try:
+            stored = self._loadPresets()[name]
+        except KeyError:
+            studio = library.getLibrary()
+            try:
+                if studio is None:
+                    raise KeyError( name )
+                stored = studio.getPreset( self.__class__.__name__, name )
+            except KeyError:
+                raise KeyError( "%s has no preset named '%s'" % ( self.__class__.__name__, name ) )
+
+        values = dict( ( field.name, field.getDefault() ) for field in self.option_fields )
+        values.update( ( k, v ) for k, v in stored.iteritems() if k in values )
+
+        return values
+
+
+    def savePreset( self, name, values=None ):
+        """Saves the current field values, or the supplied dict of values, as a named preset."""
+        if values is None:
+            values = self.getValues()
+
+        stored = {}
+        for field in self.option_fields:
+            if field.name in values and _normalize( values[field.name] ) != _normalize( field.default ):
+                stored[field.name] = _normalize( values[field.name] )
+
+        self._loadPresets()[name] = stored
+        self._storePresets()
+
+
+    def deletePreset( self, name ):
+        """Deletes the named preset."""
+        if self._loadPresets().pop( name, None ) is not None:
+            self._storePresets()
+
+
+    def applyPreset( self, name ):
+        """Sets the option fields to the named preset. Returns the names of the changed fields."""
+        return self.setValues( self.getPreset( name ) )
+
+
+def _normalize( value ):
+    """Converts option values to a comparable form, as returned by json or optionVars."""
+    if isinstance( value, ( list, tuple ) ):
+        return [ _normalize( v ) for v in value ]
+    # -- array.array and numpy arrays, as returned by ArrayField
+    if isinstance( value, array.array ) or hasattr( value, 'tolist' ):
+        return value.tolist()
+    return value
+
+
+# -- change notifications
+
+_model_subscribers = {}
+_pending = None
+
+
+@contextmanager
+def transaction():
+    """
+    Batches change notifications of all option fields until the outermost
+    transaction exits. A field changed several times is delivered once, with
+    its first old value and last new value.
+    """
+    global _pending
+
+    if _pending is not None:
+        yield
+        return
+
+    _pending = {}
+    try:
+        yield
+    finally:
+        changes, _pending = _pending, None
+        if changes:
+            _deliver( changes )
+
+
+def _notify( field, old, new ):
+    if _pending is not None:
+        if field in _pending:
+            old = _pending[field][0]
+        _pending[field] = ( old, new )
+    else:
+        _deliver( { field: ( old, new ) } )
+
+
+def _deliver( changes ):
+    by_model = {}
+
+    for field, ( old, new ) in changes.iteritems():
+        for callback in list( field._subscribers ):
+            callback( field, old, new )
+        if field.model is not None:
+            by_model.setdefault( field.model, {} )[field.name] = ( old, new )
+
+    for model, model_changes in by_model.iteritems():
+        for callback in list( _model_subscribers.get( model, () ) ):
+            callback( model_changes )
+
+
 class Field( object ):
     """
     The base field.
@@ -52,10 +281,22 @@ class Field( object ):
 
     newid = itertools.count().next
 
+    #: Model class the field is declared on, set when the model is first used.
+    model = None
+
+    #: Attributes holding gui controls, cleared by `releaseWidget`.
+    _widget_attrs = ( '_widget', '_widgets' )
+
     def __init__( self, **kwargs ):
         self.id = Field.newid()
 
 
+    def releaseWidget( self ):
+        """Releases references to gui controls once they are deleted."""
+        for attr in self._widget_attrs:
+            self.__dict__.pop( attr, None )
+
+
 class Separator( Field ):
     """
     Dummy field used to add seperation between gui controls in a view.
@@ -68,15 +309,55 @@ class Separator( Field ):
         self.widget_kwargs = kwargs
 
 
-    def buildWidget( self, **kwargs ):
+    def widgetKwargs( self ):
+        """Gets the static kwargs for building the gui control."""
+        return dict( self.widget_kwargs )
+
+
+    def buildWidget( self, spec=None, **kwargs ):
         """Builds the field gui control."""
 
-        kwargs.update( self.widget_kwargs )
+        if spec is not None:
+            kwargs.update( spec.widget_kwargs )
+        else:
+            kwargs.update( self.widgetKwargs() )
 
         self._widget = pm.separator( **kwargs )
 
 
 
+class LabelSource( object ):
+    """
+    Callable source of labels which caches its results until the scene changes.
+
+    Fields wrap callables passed as `labels` with this automatically. Pass an instance
+    directly to customize which Maya events invalidate the cached labels.
+    """
+
+    def __init__( self, func, events=callbacks.SCENE_EVENTS ):
+        self.func = func
+        self.events = events
+        self._labels = None
+        self._watching = False
+
+
+    def __call__( self ):
+        if self._labels is None:
+            self._labels = list( self.func() )
+
+            if not self._watching:
+                callbacks.onSceneChange( self.invalidate, self.events )
+                self._watching = True
+
+        return self._labels
+
+
+    def invalidate( self ):
+        """Clears the cached labels so they are queried again on next use."""
+        self._labels = None
+
+
+
 class OptionField( Field ):
     """
     The Base Option field which supports optionVar settings and gui controls.
@@ -85,14 +366,22 @@ class OptionField( Field ):
         widget_command as statcmethod
         widget_value_arg
         widget_numberof_arg
+
+    May set `value_type` to the type values are coerced to, otherwise the type
+    is inferred from the default.
     """
 
+    value_type = None
+
     def __init__( self, default, label=None, labels=[], requires=None, name=None, varname=None, **kwargs ):
         super( OptionField, self ).__init__()
 
         if not hasattr( self, 'widget_command' ):
             raise NotImplementedError( "OptionField must be sub-classed with required properties: 'widget_command', 'widget_value_arg'." )
 
+        if hasattr( labels, '__call__' ) and not isinstance( labels, LabelSource ):
+            labels = LabelSource( labels )
+
         self.default = default
         self.label = label
         self.labels = labels
@@ -103,6 +392,10 @@ class OptionField( Field ):
         self.as_list = isinstance( default, ( list, tuple ) ) and hasattr( self, 'widget_numberof_arg' )
         self.widget_kwargs = kwargs
 
+        self._coerce = self._compileCoercer()
+        self._validated = False
+        self._subscribers = []
+
     @staticmethod
     def _valueArgs( values ):
         return dict( zip( ['value1', 'value2', 'value3', 'value4'][:len( values )], values ) )
@@ -118,26 +411,170 @@ class OptionField( Field ):
         return self._varname
 
 
+    def getLabels( self ):
+        """Gets the list of labels, querying them if they come from a callable source."""
+        if isinstance( self.labels, LabelSource ):
+            return self.labels()
+        return self.labels
+
+
+    def _limits( self ):
+        """Gets the (min, max) allowed by the widget kwargs, either may be None."""
+        kwargs = self.widget_kwargs
+        minimum = kwargs.get( 'fieldMinValue', kwargs.get( 'minValue', kwargs.get( 'min' ) ) )
+        maximum = kwargs.get( 'fieldMaxValue', kwargs.get( 'maxValue', kwargs.get( 'max' ) ) )
+        return minimum, maximum
+
+
+    def _compileCoercer( self ):
+        """
+        Builds a function which converts a value to the type and length of the
+        default, or raises ValueError. Compiled once, so `set` does no lookups.
+        """
+        minimum, maximum = self._limits()
+        value_type = self.value_type
+
+        def scalar( default ):
+            if value_type is None and isinstance( default, basestring ):
+                def coerce( value ):
+                    if not isinstance( value, basestring ):
+                        raise ValueError( "expected a string, got %r" % ( value, ) )
+                    return value
+                return coerce
+
+            if value_type is not None:
+                cast = value_type
+            else:
+                cast = float if isinstance( default, float ) else int
+
+            def coerce( value ):
+                if isinstance( value, basestring ):
+                    raise ValueError( "expected a number, got %r" % ( value, ) )
+                value = cast( value )
+                if minimum is not None and value < minimum:
+                    raise ValueError( "%s is less than the minimum of %s" % ( value, minimum ) )
+                if maximum is not None and value > maximum:
+                    raise ValueError( "%s is greater than the maximum of %s" % ( value, maximum ) )
+                return value
+            return coerce
+
+        if isinstance( self.default, ( list, tuple ) ):
+            coercers = [ scalar( d ) for d in self.default ]
+            length = len( coercers )
+
+            def coerceList( value ):
+                if isinstance( value, basestring ) or not hasattr( value, '__len__' ) or len( value ) != length:
+                    raise ValueError( "expected %d values, got %r" % ( length, value ) )
+                return [ c( v ) for c, v in zip( coercers, value ) ]
+            return coerceList
+
+        return scalar( self.default )
+
+
+    def coerce( self, value ):
+        """Converts value to the field's type, raising ValueError if it is not valid."""
+        try:
+            return self._coerce( value )
+        except ( TypeError, ValueError ), e:
+            raise ValueError( "Invalid value for %s '%s': %s" % ( self.__class__.__name__, self.name, e ) )
+
+
+    def subscribe( self, callback ):
+        """Calls callback( field, old, new ) after the field's value changes."""
+        self._subscribers.append( callback )
+
+
+    def unsubscribe( self, callback ):
+        if callback in self._subscribers:
+            self._subscribers.remove( callback )
+
+
+    @property
+    def observed( self ):
+        """True if any subscriber would be notified of changes to this field."""
+        return bool( self._subscribers or _model_subscribers.get( self.model ) )
+
+
+    def isStored( self ):
+        """True if the user has stored a value for this field."""
+        blob = storage.getStore( self.model )
+        if blob is not None:
+            return blob.exists( self.name )
+        return mc.optionVar( exists=self.varname )
+
+
+    def _read( self ):
+        blob = storage.getStore( self.model )
+        if blob is not None:
+            value = blob.get( self.name )
+        else:
+            value = mc.optionVar( query=self.varname )
+
+        if self.as_list and not isinstance( value, ( list, tuple ) ):
+            value = ( value, )
+        return value
+
+
+    def _write( self, value ):
+        blob = storage.getStore( self.model )
+        if blob is not None:
+            blob.set( self.name, value )
+        else:
+            pm.optionVar[ self.varname ] = value
+
+
+    def _store( self, value ):
+        # -- old values are only read when someone is listening
+        if not self.observed:
+            self._write( value )
+            return
+
+        old = self.get()
+        self._write( value )
+        new = self.get()
+
+        if _normalize( old ) != _normalize( new ):
+            _notify( self, old, new )
+
+
     def setDefault( self ):
         """Set the optionVar to default value."""
-        pm.optionVar[ self.varname ] = self.default
+        self._store( self.default )
+
+
+    def getDefault( self ):
+        """Gets the default value, as `get` returns it when no value is stored."""
+        return self.default
 
 
     def get( self ):
-        """Gets the optionVar value, or default if it has not been set."""
-        try:
-            value = pm.optionVar[ self.varname ]
-            if self.as_list:
-                if not isinstance( value, ( list, tuple ) ):
-                    value = ( value, )
-            return value
-        except:
-            return self.default
+        """
+        Gets the optionVar value, or default if it has not been set. Values are
+        validated when set, so only the first read of a session validates a value
+        which may have been stored by an older version.
+        """
+        # -- existence is queried once, and the value read once
+        validate = not self._validated
+        self._validated = True
+
+        if not self.isStored():
+            return self.getDefault()
+
+        value = self._read()
+        if validate:
+            try:
+                self.coerce( value )
+            except ValueError, e:
+                pm.mel.warning( "%s Resetting to default." % e )
+                self.setDefault()
+                return self.getDefault()
+
+        return value
 
 
     def set( self, value ):
-        """Sets the optionVar to the specified value."""
-        pm.optionVar[ self.varname ] = value
+        """Sets the optionVar to the specified value, raising ValueError if it is not valid."""
+        self._store( self.coerce( value ) )
 
 
     @property
@@ -148,21 +585,43 @@ class OptionField( Field ):
             return utils.niceName( self.name )
 
 
-    def buildWidget( self, **kwargs ):
-        """Builds the field gui control."""
-
-        kwargs.update( self.widget_kwargs )
+    def widgetKwargs( self ):
+        """
+        Gets the kwargs for building the gui control which do not depend on the
+        current value. Labels from callable sources are excluded.
+        """
+        kwargs = dict( self.widget_kwargs )
+        kwargs['label'] = self.widget_label
 
         if self.as_list:
             kwargs[ self.widget_numberof_arg] = len( self.default )
-            kwargs.update( self._valueArgs( self.get() ) )
+
+        if self.labels and not isinstance( self.labels, LabelSource ):
             kwargs.update( self._labelArgs( self.labels ) )
+
+        return kwargs
+
+
+    def buildWidget( self, spec=None, **kwargs ):
+        """
+        Builds the field gui control. A compiled `impress.specs.FieldSpec` can be
+        supplied to skip re-deriving the static kwargs.
+        """
+
+        if spec is not None:
+            kwargs.update( spec.widget_kwargs )
+        else:
+            kwargs.update( self.widgetKwargs() )
+
+        if isinstance( self.labels, LabelSource ):
+            kwargs.update( self._labelArgs( self.getLabels() ) )
+
+        if self.as_list:
+            kwargs.update( self._valueArgs( self.get() ) )
         else:
             kwargs[self.widget_value_arg] = self.get()
-            if self.labels:
-                kwargs.update( self._labelArgs( self.labels ) )
 
-        self._widget = self.widget_command( label=self.widget_label, **kwargs )
+        self._widget = self.widget_command( **kwargs )
 
 
     def updateWidget( self ):
@@ -197,7 +656,7 @@ class OptionField( Field ):
         if self.as_list:
             kwargs.update( self._valueArgs( value ) )
         else:
-            kwargs[self.widget_value_arg] = self.get()
+            kwargs[self.widget_value_arg] = value
 
         self.widget_command( self._widget, edit=1, **kwargs )
 
@@ -251,6 +710,7 @@ class FloatField( OptionField ):
     widget_command = staticmethod( mc.floatFieldGrp )
     widget_value_arg = 'value1'
     widget_numberof_arg = 'numberOfFields'
+    value_type = float
 
 
 class FloatSlider( OptionField ):
@@ -263,6 +723,7 @@ class FloatSlider( OptionField ):
 
     widget_command = staticmethod( mc.floatSliderGrp )
     widget_value_arg = 'value'
+    value_type = float
 
 
 class ColorSlider( OptionField ):
@@ -275,6 +736,7 @@ class ColorSlider( OptionField ):
 
     widget_command = staticmethod( mc.colorSliderGrp )
     widget_value_arg = 'rgbValue'
+    value_type = float
 
 
 class RadioButton( OptionField ):
@@ -294,16 +756,24 @@ class RadioButton( OptionField ):
         super( RadioButton, self ).__init__( **kwargs )
         self.basezero = basezero
 
-    def buildWidget( self, **kwargs ):
+    def widgetKwargs( self ):
+        return dict( self.widget_kwargs )
 
-        kwargs.update( self.widget_kwargs )
+
+    def buildWidget( self, spec=None, **kwargs ):
+
+        if spec is not None:
+            kwargs.update( spec.widget_kwargs )
+        else:
+            kwargs.update( self.widgetKwargs() )
 
         self._widgets = []
         collection = None
+        all_labels = self.getLabels()
 
-        for i in xrange( 0, len( self.labels ), 4 ):
+        for i in xrange( 0, len( all_labels ), 4 ):
 
-            labels = self.labels[i:i + 4]
+            labels = all_labels[i:i + 4]
             kwargs.update( self._labelArgs( labels ) )
             kwargs[ self.widget_numberof_arg] = len( labels )
 
@@ -373,6 +843,10 @@ class OptionMenu( OptionField ):
     """
     Store one string with an option menu control.
 
+    `labels` may be a callable, such as a function listing scene cameras. Its results
+    are cached until the scene changes. Large menus are populated lazily when posted,
+    or incrementally while Maya is idle.
+
     :default type:  string
     :command:       `optionMenuGrp`
     """
@@ -380,12 +854,76 @@ class OptionMenu( OptionField ):
     widget_command = staticmethod( mc.optionMenuGrp )
     widget_value_arg = 'value'
 
-    def buildWidget( self, **kwargs ):
-        kwargs.update( self.widget_kwargs )
+    #: Menus with more labels than this are populated lazily, this many items at a time.
+    chunk_size = 200
+
+    _widget_attrs = ( '_widget', '_menu', '_labels', '_populated' )
+
+    def __init__( self, default, lazy=True, **kwargs ):
+        super( OptionMenu, self ).__init__( default, **kwargs )
+        self.lazy = lazy
+
+
+    def widgetKwargs( self ):
+        kwargs = dict( self.widget_kwargs )
+        kwargs['label'] = self.widget_label
+        return kwargs
+
+
+    def buildWidget( self, spec=None, **kwargs ):
+
+        if spec is not None:
+            kwargs.update( spec.widget_kwargs )
+        else:
+            kwargs.update( self.widgetKwargs() )
 
-        self._widget = self.widget_command( label=self.widget_label, **kwargs )
-        for label in self.labels:
-            pm.menuItem( label=label )
+        self._widget = self.widget_command( **kwargs )
+        self._menu = '%s|OptionMenu' % self._widget
+        self._labels = self.getLabels()
+        self._populated = 0
+
+        if not self.lazy or len( self._labels ) <= self.chunk_size:
+            self._populate()
+        else:
+            try:
+                mc.optionMenu( self._menu, edit=True, beforeShowPopup=lambda *args: self._populate() )
+            except TypeError:
+                # -- beforeShowPopup is not available before Maya 2016
+                pass
+            scheduler.schedule( self._populateIdle(), scheduler.LOW, name='%s.populate' % self.name )
+
+
+    def _itemCount( self, value ):
+        """Number of menu items required before value can be selected."""
+        try:
+            return self._labels.index( value ) + 1
+        except ValueError:
+            return len( self._labels )
+
+
+    def _populate( self, count=None ):
+        """Adds menu items up to count, or all remaining items if count is None."""
+        if count is None:
+            count = len( self._labels )
+
+        for label in self._labels[self._populated:count]:
+            mc.menuItem( label=label, parent=self._menu )
+
+        self._populated = max( self._populated, min( count, len( self._labels ) ) )
+
+
+    def _populateIdle( self ):
+        while hasattr( self, '_widget' ) and self._populated < len( self._labels ) \
+                and mc.optionMenuGrp( self._widget, exists=True ):
+            self._populate( self._populated + self.chunk_size )
+            yield
+
+
+    def setWidgetValue( self, value ):
+        if self._populated < len( self._labels ):
+            self._populate( self._itemCount( value ) )
+
+        super( OptionMenu, self ).setWidgetValue( value )
 
 
 class EnumOptionMenu( OptionMenu ):
@@ -398,6 +936,9 @@ class EnumOptionMenu( OptionMenu ):
 
     widget_value_arg = 'select'
 
+    def _itemCount( self, value ):
+        return min( value, len( self._labels ) )
+
 
 class TextField( OptionField ):
     """
@@ -435,3 +976,164 @@ class FileBrowser( OptionField ):
     widget_value_arg = 'text'
 
 
+class NodeList( OptionField ):
+    """
+    Store the source of the nodes a command operates on: the selection, an object
+    set or a stored list of nodes. See `impress.selection` for the source format.
+
+    The function receives the resolved node names as a tuple, or `MObjectHandle`
+    objects if `handles=True`, filtered by node `type`. Nodes are resolved once per
+    invocation with `maya.cmds`, without constructing PyNodes.
+
+    :default type:  string
+    :command:       `textFieldButtonGrp`
+    """
+
+    widget_command = staticmethod( mc.textFieldButtonGrp )
+    widget_value_arg = 'text'
+
+    def __init__( self, default=selection.SELECTION, type=None, long=False, handles=False, **kwargs ):
+        super( NodeList, self ).__init__( default, **kwargs )
+        self.type = type
+        self.long = long
+        self.handles = handles
+
+
+    def _compileCoercer( self ):
+        def coerce( value ):
+            if not isinstance( value, basestring ) or not ( value == selection.SELECTION or
+                    value.startswith( selection.SET_PREFIX ) or value.startswith( selection.NODES_PREFIX ) ):
+                raise ValueError( "expected a node source, got %r" % ( value, ) )
+            return value
+        return coerce
+
+
+    def resolve( self, value ):
+        """Resolves a stored source into nodes."""
+        return selection.resolve( value, self.type, self.long, self.handles )
+
+
+    def _storeSelected( self ):
+        nodes = mc.ls( selection=True, type=self.type, long=self.long ) if self.type else \
+                mc.ls( selection=True, long=self.long )
+        self.widget_command( self._widget, edit=True, forceChangeCommand=True,
+                             text=selection.nodesSource( nodes or [] ) )
+
+
+    def buildWidget( self, spec=None, **kwargs ):
+        kwargs.setdefault( 'buttonLabel', 'Store Selected' )
+        super( NodeList, self ).buildWidget( spec=spec, **kwargs )
+
+        self.widget_command( self._widget, edit=True, buttonCommand=lambda *args: self._storeSelected() )
+
+
+class ArrayField( OptionField ):
+    """
+    Store a large array of numbers, such as ramp or curve samples, compactly as
+    base64 encoded binary in a single string optionVar.
+
+    Values are decoded into an `array.array` of `typecode`, or a numpy array if
+    `numpy=True`, only when the stored string changes. Returned arrays are shared
+    and should be treated as read-only.
+
+    :default type:  number list or array
+    :command:       `impress.ui.arrayFieldGrp`
+    """
+
+    widget_command = staticmethod( ui.arrayFieldGrp )
+    widget_value_arg = 'values'
+
+    def __init__( self, default, typecode='f', numpy=False, **kwargs ):
+        super( ArrayField, self ).__init__( default, **kwargs )
+        self.typecode = typecode
+        self.numpy = numpy
+
+        self._raw = None
+        self._values = None
+        self._default_values = None
+
+
+    def _compileCoercer( self ):
+        return lambda values: values
+
+
+    def _encode( self, values ):
+        if hasattr( values, 'dtype' ):
+            data = values.astype( self.typecode ).tostring()
+        elif isinstance( values, array.array ) and values.typecode == self.typecode:
+            data = values.tostring()
+        else:
+            data = array.array( self.typecode, values ).tostring()
+
+        return '%s:%s' % ( self.typecode, base64.b64encode( data ) )
+
+
+    def _decode( self, raw ):
+        typecode, data = raw.split( ':', 1 )
+        data = base64.b64decode( data )
+
+        if self.numpy:
+            import numpy
+            return numpy.frombuffer( data, dtype=typecode ).astype( self.typecode )
+
+        values = array.array( typecode )
+        values.fromstring( data )
+        if typecode != self.typecode:
+            values = array.array( self.typecode, values )
+        return values
+
+
+    def _fromDefault( self ):
+        if self.numpy:
+            import numpy
+            return numpy.asarray( self.default, dtype=self.typecode )
+        return array.array( self.typecode, self.default )
+
+
+    def setDefault( self ):
+        self.set( self.default )
+
+
+    def getDefault( self ):
+        """Gets the default decoded into an array, so callers get the same type whether or not a value is stored."""
+        if self._default_values is None:
+            self._default_values = self._fromDefault()
+        return self._default_values
+
+
+    def get( self ):
+        """Gets the decoded array, decoding only if the stored string changed."""
+        if self.isStored():
+            raw = self._read()
+        else:
+            if self._raw is not False:
+                self._raw = False
+                self._values = self.getDefault()
+            return self._values
+
+        if raw != self._raw:
+            try:
+                self._values = self._decode( raw )
+            except ( ValueError, TypeError ):
+                self._values = self.getDefault()
+            self._raw = raw
+
+        return self._values
+
+
+    def set( self, values ):
+        """Encodes and stores values, unless they are the array last returned by `get`."""
+        if values is self._values and self._raw is not None:
+            return
+
+        raw = self._encode( values )
+        old = self.get() if self.observed else None
+        changed = raw != self._raw
+
+        self._write( raw )
+
+        self._raw = raw
+        self._values = self._decode( raw )
+
+        if changed and self.observed:
+            _notify( self, old, self._values )
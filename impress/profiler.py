@@ -0,0 +1,202 @@
+"""
+Module for recording a timeline of tool startup.
+
+When enabled, module imports, model instantiation, command construction and
+registration, and menu building are recorded as spans, and saved as a Chrome
+trace json file which can be opened in ``chrome://tracing`` or Perfetto.
+
+Set the ``IMPRESS_PROFILE`` environment variable to a file path to record from
+the moment impress is first imported. The trace is saved when Maya exits, or
+with `save`::
+
+    IMPRESS_PROFILE=/tmp/startup.json maya
+
+When disabled, spans cost a single function call.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import __builtin__
+from functools import wraps
+
+
+PROFILE_ENV = 'IMPRESS_PROFILE'
+
+_events = None
+_path = None
+_origin = time.time()
+_original_import = None
+
+
+def _now():
+    return ( time.time() - _origin ) * 1e6
+
+
+def _record( name, cat, start, end, args=None ):
+    event = {
+        'name': name,
+        'cat': cat,
+        'ph': 'X',
+        'ts': start,
+        'dur': end - start,
+        'pid': os.getpid(),
+        'tid': threading.current_thread().ident,
+    }
+    if args:
+        event['args'] = args
+
+    _events.append( event )
+
+
+class _Span( object ):
+
+    __slots__ = ( 'name', 'cat', 'args', 'start' )
+
+    def __init__( self, name, cat, args ):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+
+    def __enter__( self ):
+        self.start = _now()
+        return self
+
+
+    def __exit__( self, *exc_info ):
+        if _events is not None:
+            _record( self.name, self.cat, self.start, _now(), self.args )
+
+
+class _NullSpan( object ):
+
+    def __enter__( self ):
+        return self
+
+
+    def __exit__( self, *exc_info ):
+        pass
+
+
+_null_span = _NullSpan()
+
+
+def span( name, cat='impress', **args ):
+    """Context manager recording a span of the timeline, if enabled."""
+    if _events is None:
+        return _null_span
+    return _Span( name, cat, args )
+
+
+def traced( cat ):
+    """
+    Decorator recording calls of a function as spans. Methods are named after the
+    class of the instance they are called on.
+    """
+
+    def decorator( func ):
+
+        @wraps( func )
+        def wrapper( *args, **kwargs ):
+            if _events is None:
+                return func( *args, **kwargs )
+
+            name = func.__name__
+            if args and hasattr( args[0], func.__name__ ):
+                name = '%s.%s' % ( args[0].__class__.__name__, name )
+
+            start = _now()
+            try:
+                return func( *args, **kwargs )
+            finally:
+                _record( name, cat, start, _now() )
+
+        return wrapper
+
+    return decorator
+
+
+def _import( name, globals=None, locals=None, fromlist=None, level=-1 ):
+    if _events is None:
+        return _original_import( name, globals, locals, fromlist, level )
+
+    # -- only imports which load new modules are recorded
+    count = len( sys.modules )
+    start = _now()
+    try:
+        return _original_import( name, globals, locals, fromlist, level )
+    finally:
+        if len( sys.modules ) > count:
+            _record( name, 'import', start, _now() )
+
+
+def isEnabled():
+    return _events is not None
+
+
+def enable( path=None ):
+    """Starts recording, to be saved at path when Maya exits."""
+    global _events, _path, _original_import
+
+    if _events is None:
+        _events = []
+
+    if path is not None:
+        _path = path
+
+    if _original_import is None:
+        _original_import = __builtin__.__import__
+        __builtin__.__import__ = _import
+
+
+def disable():
+    """Stops recording and saves the trace, if a path was set."""
+    global _events, _original_import
+
+    if _original_import is not None:
+        if __builtin__.__import__ is _import:
+            __builtin__.__import__ = _original_import
+        _original_import = None
+
+    if _events is not None:
+        if _path is not None:
+            save()
+        _events = None
+
+
+def save( path=None ):
+    """Writes the recorded spans as a Chrome trace json file."""
+    if path is None:
+        path = _path
+    if path is None or _events is None:
+        return
+
+    directory = os.path.dirname( path )
+    if directory and not os.path.isdir( directory ):
+        os.makedirs( directory )
+
+    with open( path, 'w' ) as f:
+        json.dump( { 'traceEvents': _events, 'displayTimeUnit': 'ms' }, f, separators=( ',', ':' ) )
+
+
+def summarize( cat=None, top=20 ):
+    """Gets a list of (name, total seconds, count) of the slowest recorded span names, optionally of one category."""
+    totals = {}
+    for event in _events or ():
+        if cat is None or event['cat'] == cat:
+            total, count = totals.get( event['name'], ( 0.0, 0 ) )
+            totals[event['name']] = ( total + event['dur'] / 1e6, count + 1 )
+
+    return sorted( ( ( name, total, count ) for name, ( total, count ) in totals.iteritems() ),
+                   key=lambda item: -item[1] )[:top]
+
+
+atexit.register( save )
+
+
+if os.environ.get( PROFILE_ENV ):
+    enable( os.environ[PROFILE_ENV] )
@@ -0,0 +1,362 @@
+"""
+Qt view backend for option models.
+
+`QtOptionView` renders the same `OptionModel` fields as `views.OptionBoxView`,
+but in a virtualized Qt table bound directly to the fields' stored values. Only
+visible rows are painted and edits write straight to the option store, so large
+models update without a Maya command round-trip per control.
+
+Requires PySide2, or PySide on older versions of Maya. Can be used outside of a
+Maya gui session, for example with ``QT_QPA_PLATFORM=offscreen``.
+"""
+
+try:
+    from PySide2 import QtCore, QtWidgets
+except ImportError:
+    from PySide import QtCore, QtGui as QtWidgets
+
+import models
+import views
+
+
+def _mayaMainWindow():
+    try:
+        import maya.OpenMayaUI as omui
+        try:
+            from shiboken2 import wrapInstance
+        except ImportError:
+            from shiboken import wrapInstance
+
+        ptr = omui.MQtUtil.mainWindow()
+        if ptr is not None:
+            return wrapInstance( long( ptr ), QtWidgets.QWidget )
+    except ImportError:
+        pass
+
+    return None
+
+
+def _formatValue( value ):
+    if isinstance( value, ( list, tuple ) ):
+        return ' '.join( _formatValue( v ) for v in value )
+    elif isinstance( value, float ):
+        return '%g' % value
+    return unicode( value )
+
+
+def _parseValue( text, default ):
+    """Parses text into a value of the same type and length as default."""
+    if isinstance( default, ( list, tuple ) ):
+        parts = text.replace( ',', ' ' ).split()
+        if len( parts ) != len( default ):
+            raise ValueError( "Expected %d values." % len( default ) )
+        return [ _parseValue( p, d ) for p, d in zip( parts, default ) ]
+    elif isinstance( default, bool ):
+        return text.strip().lower() in ( '1', 'true', 'on', 'yes' )
+    elif isinstance( default, int ):
+        return int( float( text ) )
+    elif isinstance( default, float ):
+        return float( text )
+    return text
+
+
+class FieldTableModel( QtCore.QAbstractTableModel ):
+    """
+    Table of option fields and their values, read once and written through to
+    the option store on edit.
+    """
+
+    valueChanged = QtCore.Signal( str )
+
+    def __init__( self, spec, parent=None ):
+        super( FieldTableModel, self ).__init__( parent )
+
+        self.spec = spec
+        self.rows = [ field_spec for field_spec in spec.fields ]
+        self._rowOf = dict( ( field_spec.name, i ) for i, field_spec in enumerate( self.rows ) )
+        self._values = {}
+        self.reload()
+
+
+    def reload( self, names=None ):
+        """Re-reads stored values, of all fields or only of the named fields and their dependents."""
+        if names is None:
+            names = [ field_spec.name for field_spec in self.rows ]
+        else:
+            names = set( names )
+            for name in list( names ):
+                names.update( s.name for s in self.spec.dependents.get( name, () ) )
+
+        for name in names:
+            field = self.rows[self._rowOf[name]].field
+            if hasattr( field, 'get' ):
+                self._values[name] = field.get()
+
+            row = self._rowOf[name]
+            self.dataChanged.emit( self.index( row, 0 ), self.index( row, 1 ) )
+
+
+    def field( self, index ):
+        return self.rows[index.row()].field
+
+
+    def value( self, name ):
+        return self._values.get( name )
+
+
+    def isEnabled( self, field_spec ):
+        if not hasattr( field_spec.field, 'get' ):
+            return False
+        if not field_spec.requires:
+            return True
+
+        required, cmp = field_spec.requires
+        value = self._values.get( required.name )
+        if hasattr( cmp, '__call__' ):
+            return bool( cmp( value ) )
+        return value == cmp
+
+
+    # -- Qt model interface
+
+    def rowCount( self, parent=QtCore.QModelIndex() ):
+        return 0 if parent.isValid() else len( self.rows )
+
+
+    def columnCount( self, parent=QtCore.QModelIndex() ):
+        return 2
+
+
+    def headerData( self, section, orientation, role=QtCore.Qt.DisplayRole ):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return ( 'Option', 'Value' )[section]
+
+
+    def flags( self, index ):
+        field_spec = self.rows[index.row()]
+        if not self.isEnabled( field_spec ):
+            return QtCore.Qt.NoItemFlags
+
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if index.column() == 1:
+            if isinstance( field_spec.field, models.CheckBox ) and not field_spec.field.as_list:
+                flags |= QtCore.Qt.ItemIsUserCheckable
+            elif not isinstance( field_spec.field, models.ArrayField ):
+                flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+
+    def data( self, index, role=QtCore.Qt.DisplayRole ):
+        field_spec = self.rows[index.row()]
+        field = field_spec.field
+
+        if index.column() == 0:
+            if role == QtCore.Qt.DisplayRole:
+                return field_spec.label or ''
+            return None
+
+        if not hasattr( field, 'get' ):
+            return None
+
+        value = self._values.get( field_spec.name )
+
+        if isinstance( field, models.CheckBox ) and not field.as_list:
+            if role == QtCore.Qt.CheckStateRole:
+                return QtCore.Qt.Checked if value else QtCore.Qt.Unchecked
+            return None
+
+        if role == QtCore.Qt.DisplayRole:
+            if isinstance( field, models.ArrayField ):
+                return '%d values' % len( value )
+            elif isinstance( field, models.EnumOptionMenu ):
+                labels = field.getLabels()
+                return labels[value - 1] if 0 < value <= len( labels ) else ''
+            elif isinstance( field, models.RadioButton ):
+                labels = field.getLabels()
+                index = value if field.basezero else value - 1
+                return labels[index] if 0 <= index < len( labels ) else ''
+            return _formatValue( value )
+        elif role == QtCore.Qt.EditRole:
+            return value
+
+        return None
+
+
+    def setData( self, index, value, role=QtCore.Qt.EditRole ):
+        field_spec = self.rows[index.row()]
+
+        if role == QtCore.Qt.CheckStateRole:
+            value = int( value == QtCore.Qt.Checked or value == 2 )
+        elif role != QtCore.Qt.EditRole:
+            return False
+
+        field_spec.field.set( value )
+        self._values[field_spec.name] = field_spec.field.get()
+
+        self.dataChanged.emit( index, index )
+        for dependent in self.spec.dependents.get( field_spec.name, () ):
+            row = self._rowOf[dependent.name]
+            self.dataChanged.emit( self.index( row, 0 ), self.index( row, 1 ) )
+
+        self.valueChanged.emit( field_spec.name )
+        return True
+
+
+class FieldDelegate( QtWidgets.QStyledItemDelegate ):
+    """
+    Creates an editor matching the field type of the edited row.
+    """
+
+    def createEditor( self, parent, option, index ):
+        field = index.model().field( index )
+
+        if isinstance( field, ( models.OptionMenu, models.RadioButton ) ):
+            editor = QtWidgets.QComboBox( parent )
+            editor.addItems( [ unicode( label ) for label in field.getLabels() ] )
+            return editor
+        elif isinstance( field.default, bool ) or isinstance( field.default, ( list, tuple ) ):
+            return QtWidgets.QLineEdit( parent )
+        elif isinstance( field, ( models.FloatField, models.FloatSlider ) ) or isinstance( field.default, float ):
+            editor = QtWidgets.QDoubleSpinBox( parent )
+            editor.setDecimals( field.widget_kwargs.get( 'precision', 3 ) )
+            minimum, maximum = field._limits()
+            editor.setRange( -1e9 if minimum is None else minimum, 1e9 if maximum is None else maximum )
+            return editor
+        elif isinstance( field.default, int ) and not isinstance( field, models.CheckBox ):
+            editor = QtWidgets.QSpinBox( parent )
+            # -- the same limits the field validates against when set
+            minimum, maximum = field._limits()
+            editor.setRange( -2 ** 31 if minimum is None else int( minimum ), 2 ** 31 - 1 if maximum is None else int( maximum ) )
+            return editor
+
+        return QtWidgets.QLineEdit( parent )
+
+
+    def setEditorData( self, editor, index ):
+        field = index.model().field( index )
+        value = index.model().data( index, QtCore.Qt.EditRole )
+
+        if isinstance( editor, QtWidgets.QComboBox ):
+            if isinstance( field, models.EnumOptionMenu ):
+                editor.setCurrentIndex( value - 1 )
+            elif isinstance( field, models.RadioButton ):
+                editor.setCurrentIndex( value if field.basezero else value - 1 )
+            else:
+                editor.setCurrentIndex( max( 0, editor.findText( unicode( value ) ) ) )
+        elif isinstance( editor, ( QtWidgets.QSpinBox, QtWidgets.QDoubleSpinBox ) ):
+            editor.setValue( value )
+        else:
+            editor.setText( _formatValue( value ) )
+
+
+    def setModelData( self, editor, model, index ):
+        field = model.field( index )
+
+        if isinstance( editor, QtWidgets.QComboBox ):
+            if isinstance( field, models.EnumOptionMenu ):
+                value = editor.currentIndex() + 1
+            elif isinstance( field, models.RadioButton ):
+                value = editor.currentIndex() + ( 0 if field.basezero else 1 )
+            else:
+                value = editor.currentText()
+        elif isinstance( editor, ( QtWidgets.QSpinBox, QtWidgets.QDoubleSpinBox ) ):
+            value = editor.value()
+        else:
+            try:
+                value = _parseValue( editor.text(), field.default )
+            except ValueError:
+                return
+
+        model.setData( index, value, QtCore.Qt.EditRole )
+
+
+class QtOptionView( views.BaseView ):
+    """
+    View rendering option fields in a virtualized Qt table, with values bound
+    directly to the option store.
+    """
+
+    def __init__( self, optionmodel, command=None, parent=None ):
+        super( QtOptionView, self ).__init__( optionmodel )
+
+        self.command = command
+        self.parent = parent
+        self.window = None
+        self.table_model = None
+
+
+    def _build( self ):
+        parent = self.parent if self.parent is not None else _mayaMainWindow()
+
+        window = QtWidgets.QWidget( parent, QtCore.Qt.Window )
+        window.setWindowTitle( self.spec.title )
+        window.setAttribute( QtCore.Qt.WA_DeleteOnClose )
+        window.destroyed.connect( self._callback( 'teardown' ) )
+
+        self.table_model = FieldTableModel( self.spec, window )
+
+        table = QtWidgets.QTableView( window )
+        table.setModel( self.table_model )
+        table.setItemDelegate( FieldDelegate( table ) )
+        table.verticalHeader().hide()
+        table.horizontalHeader().setStretchLastSection( True )
+        table.setEditTriggers( QtWidgets.QAbstractItemView.AllEditTriggers )
+        self.table = table
+
+        buttons = QtWidgets.QHBoxLayout()
+        for label, method, args in ( ( self.spec.button_label, '_onClickApply', ( True, ) ),
+                                     ( 'Apply', '_onClickApply', () ),
+                                     ( 'Reset', '_updateOptions', ( True, ) ),
+                                     ( 'Close', 'hide', () ) ):
+            if method == '_onClickApply' and self.command is None:
+                continue
+            button = QtWidgets.QPushButton( label, window )
+            button.clicked.connect( self._callback( method, *args ) )
+            buttons.addWidget( button )
+
+        layout = QtWidgets.QVBoxLayout( window )
+        layout.addWidget( table )
+        layout.addLayout( buttons )
+
+        self.window = window
+
+
+    def _updateWidgets( self, names=None ):
+        if self.table_model is not None:
+            self.table_model.reload( names )
+
+
+    def _updateOptions( self, forceDefaults=False ):
+        # -- values are written as they are edited, so only defaults need setting
+        if forceDefaults:
+            super( QtOptionView, self )._updateOptions( forceDefaults=True )
+            self._updateWidgets()
+
+
+    def _onClickApply( self, close=False ):
+        self.command.__call__()
+
+        if close:
+            self.hide()
+
+
+    def show( self ):
+        if self.window is None:
+            self._build()
+
+        self._keepAlive()
+        self.window.show()
+        self.window.raise_()
+
+
+    def teardown( self ):
+        self.window = None
+        self.table_model = None
+        super( QtOptionView, self ).teardown()
+
+
+    def hide( self ):
+        window = self.window
+        super( QtOptionView, self ).hide()
+        if window is not None:
+            window.close()
@@ -2,11 +2,61 @@
 Module for registering functions with Maya.
 """
 
+import sys
 import traceback
+from timeit import default_timer as _timer
 import pymel.core as pm
 import utils
 import views
 import models
+import cache
+import coroutines
+import selection
+import profiler
+
+
+#: Registered commands keyed by their importable path, eg: "myTools.performMyExample".
+commands = {}
+
+_invoke_callbacks = []
+
+
+def addInvokeCallback( func ):
+    """
+    Calls func after every command invocation, with the arguments:
+    command, args, kwargs, duration in seconds and exc_info, which is None on success.
+    """
+    if func not in _invoke_callbacks:
+        _invoke_callbacks.append( func )
+
+
+def removeInvokeCallback( func ):
+    """Removes a func previously added with `addInvokeCallback`."""
+    if func in _invoke_callbacks:
+        _invoke_callbacks.remove( func )
+
+
+def getCommand( key ):
+    """Gets a registered command by key, importing its module if it is not registered yet."""
+    try:
+        return commands[key]
+    except KeyError:
+        module_name = key.rpartition( '.' )[0]
+        if not module_name:
+            raise KeyError( "No command registered as '%s'." % key )
+
+        __import__( module_name )
+
+        try:
+            return commands[key]
+        except KeyError:
+            raise KeyError( "No command registered as '%s'." % key )
+
+
+def dispatch( key, *args, **kwargs ):
+    """Invokes a registered command by key. See `impress.dispatch`."""
+    return getCommand( key )( *args, **kwargs )
+
 
 class RuntimeCommand( object ):
     """
@@ -14,40 +64,43 @@ class RuntimeCommand( object ):
     """
 
     def __init__( self, func, name=None, label=None, category=None, annotation=None, register=True, args=(), kwargs={} ):
+        with profiler.span( 'RuntimeCommand(%s)' % func.__name__, 'command' ):
+            self.func = func
+            self.args = args
+            self.kwargs = kwargs
 
-        self.func = func
-        self.args = args
-        self.kwargs = kwargs
+            self.__doc__ = self.func.__doc__
 
-        self.__doc__ = self.func.__doc__
+            if name is None:
+                with profiler.span( 'inferName', 'command' ):
+                    ( filename, line_number, function_name, text ) = traceback.extract_stack()[-2]
+                try:
+                    name = text[:text.find( '=' )].strip()
+                except AttributeError:
+                    assert False, "'name' not provided and could not be extrapolated."
 
-        if name is None:
-            ( filename, line_number, function_name, text ) = traceback.extract_stack()[-2]
-            try:
-                name = text[:text.find( '=' )].strip()
-            except AttributeError:
-                assert False, "'name' not provided and could not be extrapolated."
+            self.__name__ = self.name = name
 
-        self.__name__ = self.name = name
+            if label is None:
+                label = utils.pascalCase( self.name )
+            self.label = label
 
-        if label is None:
-            label = utils.pascalCase( self.name )
-        self.label = label
+            if category is None:
+                if self.func.__module__ != '__main__':
+                    category = ' '.join( [ utils.pascalCase( c ) for c in self.func.__module__.split( '.' )[:2]] )
+            self.category = category
 
-        if category is None:
-            if self.func.__module__ != '__main__':
-                category = ' '.join( [ utils.pascalCase( c ) for c in self.func.__module__.split( '.' )[:2]] )
-        self.category = category
+            if annotation is None:
+                try:
+                    annotation = self.func.__doc__.strip().splitlines()[0].split( '.' )[0]
+                except:
+                    annotation = self.label
+            self.annotation = annotation
 
-        if annotation is None:
-            try:
-                annotation = self.func.__doc__.strip().splitlines()[0].split( '.' )[0]
-            except:
-                annotation = self.label
-        self.annotation = annotation
+            commands[self.key] = self
 
-        if register:
-            self.register()
+            if register:
+                self.register()
 
 
     @property
@@ -55,6 +108,62 @@ class RuntimeCommand( object ):
         return self.func.__name__
 
 
+    @property
+    def key( self ):
+        """Importable path of the command, used as its key in `commands`."""
+        return self._perform_func_str
+
+
+    @property
+    def is_coroutine( self ):
+        return coroutines.iscoroutinefunction( self.func )
+
+
+    def _invoke( self, *args, **kwargs ):
+        """
+        Calls the function with resolved args, reporting to any invoke callbacks.
+        """
+        if not _invoke_callbacks:
+            return self._call( *args, **kwargs )
+
+        start = _timer()
+        try:
+            result = self._call( *args, **kwargs )
+        except Exception:
+            exc_info = sys.exc_info()
+            self._report( args, kwargs, _timer() - start, exc_info )
+            raise exc_info[0], exc_info[1], exc_info[2]
+
+        self._report( args, kwargs, _timer() - start )
+
+        return result
+
+
+    def _report( self, args, kwargs, duration, exc_info=None ):
+        """Reports an invocation to the invoke callbacks, for calls made without `_invoke`."""
+        for func in list( _invoke_callbacks ):
+            func( self, args, kwargs, duration, exc_info )
+
+
+    def _run( self, args, kwargs ):
+        """Invokes the function with resolved args and kwargs, the way `__call__` does."""
+        return self._invoke( *args, **kwargs )
+
+
+    def _call( self, *args, **kwargs ):
+        """
+        Calls the function. Coroutine functions are started as a `coroutines.Task`
+        which is returned, or waited on in batch mode.
+        """
+        if self.is_coroutine:
+            task = coroutines.run( self.func, *args, **kwargs )
+            if pm.about( batch=True ):
+                return task.wait()
+            return task
+
+        return self.func( *args, **kwargs )
+
+
     @property
     def _perform_func_str( self ):
 
@@ -65,6 +174,12 @@ class RuntimeCommand( object ):
         return func_str
 
 
+    def get_dispatch_str( self, *args ):
+        """Gets the python source which invokes this command through `impress.dispatch`."""
+        args_str = ''.join( ', %r' % ( a, ) for a in args )
+        return "import impress; impress.dispatch('%s'%s)" % ( self.key, args_str )
+
+
     @property
     def _func_str( self ):
 
@@ -131,17 +246,20 @@ class RuntimeCommand( object ):
 
         print "OUTPUT:", _args
 
-        self.func( *_args, **_kwargs )
+        result = self._run( _args, _kwargs )
 
         print "# Result: %s #" % self.get_cmd_str( *args, **kwargs )
 
+        return result
 
-    def register( self ):
+
+    def runtimeCommands( self ):
+        """Gets a list of (name, kwargs) of the runtime commands to register."""
 
         kwargs = {}
 
         name = self.label
-        cmd_str = self.get_cmd_str()
+        cmd_str = self.get_dispatch_str()
 
         kwargs['annotation'] = self.annotation
 
@@ -154,42 +272,63 @@ class RuntimeCommand( object ):
         if self.category is not None:
             kwargs['category'] = self.category
 
-        if not pm.runTimeCommand( name, exists=1 ):
-            pm.runTimeCommand( name, default=True, **kwargs )
-            print "# Adding runtime:", name, ':', cmd_str
+        return [ ( name, kwargs ) ]
+
+
+    @profiler.traced( 'register' )
+    def register( self ):
+
+        for name, kwargs in self.runtimeCommands():
+            if not pm.runTimeCommand( name, exists=1 ):
+                pm.runTimeCommand( name, default=True, **kwargs )
+                print "# Adding runtime:", name, ':', kwargs['command']
 
 
 class PerformCommand( RuntimeCommand ):
     """
     Callable class for registering functions with OptionModels and as runtime commands.
+
+    Commands which are pure functions of their options can set `memoize` to cache
+    results keyed on the resolved kwargs. A `fingerprint` callable returning a
+    hashable summary of relevant scene state can be supplied to extend the key.
+    Cached results are evicted beyond `cache_size` entries or `cache_age` seconds,
+    and cleared on scene changes.
     """
 
-    def __init__( self, func, optionmodel=None, view=views.OptionBoxView, name=None, label=None, category=None, annotation=None, args=(), kwargs={} ):
+    def __init__( self, func, optionmodel=None, view=views.OptionBoxView, name=None, label=None, category=None, annotation=None, args=(), kwargs={},
+                  memoize=False, fingerprint=None, cache_size=32, cache_age=None ):
+        with profiler.span( 'PerformCommand(%s)' % func.__name__, 'command' ):
+            if name is None:
+                with profiler.span( 'inferName', 'command' ):
+                    ( filename, line_number, function_name, text ) = traceback.extract_stack()[-2]
+                try:
+                    name = text[:text.find( '=' )].strip()
+                except AttributeError:
+                    name = 'perform' + utils.pascalCase( func.__name__ )
+                    pm.mel.warning( "'name' not provided and could not be extrapolated. Assuming: '%s'" % name )
 
-        if name is None:
-            ( filename, line_number, function_name, text ) = traceback.extract_stack()[-2]
-            try:
-                name = text[:text.find( '=' )].strip()
-            except AttributeError:
-                name = 'perform' + utils.pascalCase( func.__name__ )
-                pm.mel.warning( "'name' not provided and could not be extrapolated. Assuming: '%s'" % name )
+            if label is None:
+                label = utils.pascalCase( func.__name__ )
 
-        if label is None:
-            label = utils.pascalCase( func.__name__ )
+            super( PerformCommand, self ).__init__( func, name, label, category, annotation, False, args, kwargs )
 
-        super( PerformCommand, self ).__init__( func, name, label, category, annotation, False, args, kwargs )
+            self.view = view
 
-        self.view = view
+            if optionmodel is not None:
+                if not isinstance( optionmodel, models.OptionModel ) and not issubclass( optionmodel, models.OptionModel ):
+                    raise TypeError( "`optionmodel` must subclass of %s" % models.OptionModel )
+                elif not hasattr( optionmodel, 'options' ):
+                    optionmodel = optionmodel()
 
-        if optionmodel is not None:
-            if not isinstance( optionmodel, models.OptionModel ) and not issubclass( optionmodel, models.OptionModel ):
-                raise TypeError( "`optionmodel` must subclass of %s" % models.OptionModel )
-            elif not hasattr( optionmodel, 'options' ):
-                optionmodel = optionmodel()
+            self.optionmodel = optionmodel
 
-        self.optionmodel = optionmodel
+            self.fingerprint = fingerprint
+            if memoize:
+                self.cache = cache.ResultCache( cache_size, cache_age )
+            else:
+                self.cache = None
 
-        self.register()
+            self.register()
 
 
     @property
@@ -197,8 +336,8 @@ class PerformCommand( RuntimeCommand ):
         return self.optionmodel is not None
 
 
-    def _get_kwargs( self ):
-        kwargs = self.kwargs
+    def _get_kwargs( self, preset=None, overrides={} ):
+        kwargs = dict( self.kwargs )
 
         if self.has_fields:
             preResults = self.optionmodel.preApply()
@@ -207,18 +346,61 @@ class PerformCommand( RuntimeCommand ):
 
             kwargs.update( preResults )
 
+            if preset is not None:
+                kwargs.update( self.optionmodel.getPreset( preset ) )
+            else:
+                kwargs.update( self.optionmodel.resolve() )
+
+        kwargs.update( overrides )
+
+        return kwargs
+
+
+    def _resolve_kwargs( self, kwargs ):
+        """Resolves stored values of fields such as `models.NodeList` into the values passed to the function."""
+        if self.has_fields:
+            kwargs = dict( kwargs )
             for o in self.optionmodel.fields:
-                if hasattr( o, 'get' ):
-                    kwargs[o.name] = o.get()
+                if hasattr( o, 'resolve' ) and o.name in kwargs:
+                    kwargs[o.name] = o.resolve( kwargs[o.name] )
 
         return kwargs
 
 
-    def __call__( self, action=0 ):
+    def _run( self, args, kwargs ):
+        """
+        Invokes the function with resolved kwargs, or gets its cached result.
+        Positional args are ignored, as the function only takes options.
+        """
+        if self.cache is None:
+            return self._invoke( **kwargs )
+
+        key = self.cache.key( kwargs, self.fingerprint )
+        try:
+            return self.cache.get( key )
+        except KeyError:
+            result = self._invoke( **kwargs )
+            self.cache.store( key, result )
+            return result
+
+
+    def __call__( self, action=0, preset=None, **overrides ):
+        """
+        Performs the command with the resolved options, or with the values of the
+        named `preset` without changing the stored options. Supplied kwargs take
+        precedence over both.
+        """
+
+        if action in ( 0, 2 ):
+            kwargs = self._get_kwargs( preset, overrides )
+            if kwargs is None:
+                return
+
+        result = None
 
         if action == 0:
-            kwargs = self._get_kwargs()
-            self.func( **kwargs )
+            with selection.snapshot():
+                result = self._run( (), self._resolve_kwargs( kwargs ) )
         elif action == 1:
             if self.optionmodel is not None:
                 self.view( self.optionmodel, self ).show()
@@ -226,20 +408,23 @@ class PerformCommand( RuntimeCommand ):
                 pm.mel.error( "This command has no fields." );
 
         if action in ( 0, 2 ):
-            print "# Result: %s #" % self.get_cmd_str()
+            print "# Result: %s #" % self.get_cmd_str( **kwargs )
 
+        return result
 
-    def register( self ):
 
-        kwargs = {}
+    def runtimeCommands( self ):
+
+        runtimes = []
 
         for i in range( 1 + self.has_fields ):
+            kwargs = {}
             name = [self.label, self.label + 'Options'][i]
 
             if self.has_fields:
-                cmd_str = '%s(%d)' % ( self._perform_func_str, i )
+                cmd_str = self.get_dispatch_str( i )
             else:
-                cmd_str = '%s()' % ( self._perform_func_str, )
+                cmd_str = self.get_dispatch_str()
 
             if i == self.has_fields:
                 kwargs['annotation'] = utils.niceName( name )
@@ -255,10 +440,110 @@ class PerformCommand( RuntimeCommand ):
             if self.category is not None:
                 kwargs['category'] = self.category
 
-            if not pm.runTimeCommand( name, exists=1 ):
-                pm.runTimeCommand( name, default=True, **kwargs )
-                print "# Adding runtime:", name, ':', cmd_str
+            runtimes.append( ( name, kwargs ) )
+
+        return runtimes
+
+
+class Pipeline( RuntimeCommand ):
+    """
+    Callable class for chaining commands into a single runtime command.
+
+    Steps are commands, command keys, or (command, overrides) tuples where
+    overrides is a dict of kwargs replacing the step's stored options::
+
+        cleanupTransforms = register.Pipeline( [
+            performFreezeTransforms,
+            ( performRandomTransform, {'rotate': False} ),
+        ] )
+
+    All kwargs are resolved before the first step runs, sharing one selection
+    snapshot. The steps then run inside one undo chunk with refresh suspended.
+    """
+
+    def __init__( self, steps, name=None, label=None, category=None, annotation=None, register=True ):
+
+        if name is None:
+            with profiler.span( 'inferName', 'command' ):
+                ( filename, line_number, function_name, text ) = traceback.extract_stack()[-2]
+            try:
+                name = text[:text.find( '=' )].strip()
+            except AttributeError:
+                assert False, "'name' not provided and could not be extrapolated."
+
+        self.steps = []
+        for step in steps:
+            if not isinstance( step, tuple ):
+                step = ( step, {} )
+            self.steps.append( step )
+
+        def pipeline():
+            return self.run()
+
+        pipeline.__name__ = name
+        pipeline.__module__ = sys._getframe( 1 ).f_globals.get( '__name__', '__main__' )
+        pipeline.__doc__ = "Runs %s." % ', '.join( utils.niceName( self._stepName( c ) ) for c, o in self.steps )
+
+        super( Pipeline, self ).__init__( pipeline, name, label, category, annotation, register )
+
+
+    @staticmethod
+    def _stepName( command ):
+        # -- keys are not looked up here, so their modules are only imported when run
+        if isinstance( command, basestring ):
+            return command.rpartition( '.' )[2]
+        return command.name
+
+
+    @staticmethod
+    def _getCommand( command ):
+        if isinstance( command, basestring ):
+            return getCommand( command )
+        return command
+
+
+    def _resolve( self ):
+        calls = []
+
+        for command, overrides in self.steps:
+            command = self._getCommand( command )
+
+            kwargs = command._get_kwargs()
+            if kwargs is None:
+                return None
+
+            kwargs.update( overrides )
+            if hasattr( command, '_resolve_kwargs' ):
+                kwargs = command._resolve_kwargs( kwargs )
+
+            calls.append( ( command, command._get_args(), kwargs ) )
+
+        return calls
+
+
+    def run( self ):
+        """Runs the steps as one undoable operation. Returns the list of step results."""
+
+        with selection.snapshot():
+            calls = self._resolve()
+            if calls is None:
+                return None
+
+            pm.undoInfo( openChunk=True, chunkName=self.name )
+            pm.refresh( suspend=True )
+            try:
+                return [ command._run( args, kwargs ) for command, args, kwargs in calls ]
+            finally:
+                pm.refresh( suspend=False )
+                pm.undoInfo( closeChunk=True )
+
+
+    def __call__( self ):
+        results = self.run()
+
+        print "# Result: %s #" % self.get_cmd_str()
 
+        return results
 
 
 def runtime( func, name=None, label=None, category=None, annotation=None, args=(), kwargs={} ):
@@ -0,0 +1,308 @@
+"""
+Module for running small tasks while Maya is idle.
+
+Tasks are queued by priority and run from an idle script job, which only
+exists while tasks are ready to run. While every queued task is asleep the job
+is killed, and a timer re-arms it when the first one wakes. Each idle slice
+runs tasks until its time `budget` is spent, so background work never holds up
+the gui for long.
+
+A task is a callable, or a generator which yields between steps of work. A
+generator is stepped once at a time and queued again behind tasks of the same
+priority, so long tasks do not starve short ones. A generator may also yield a
+number of seconds to sleep before its next step. Waiting tasks gain priority
+with age::
+
+    def buildIndex( names ):
+        for name in names:
+            index.add( name )
+            yield
+
+    scheduler.schedule( buildIndex( names ), scheduler.LOW, name='buildIndex' )
+
+In batch mode there is no idle event, so queued tasks are run synchronously.
+"""
+
+import sys
+import time
+import heapq
+import itertools
+import traceback
+import types
+import threading
+import maya.cmds as mc
+import maya.utils
+
+
+HIGH = 0
+NORMAL = 50
+LOW = 100
+
+#: Seconds of work per idle slice.
+budget = 0.005
+
+#: Priority gained per second spent waiting.
+aging = 10.0
+
+
+class Task( object ):
+    """
+    A queued callable or generator, with accounting of the time spent in it.
+    """
+
+    def __init__( self, work, priority, name ):
+        self.work = work
+        self.priority = priority
+        self.name = name
+
+        self.steps = 0
+        self.runtime = 0.0
+        self.waiting_since = time.time()
+        self.wake_at = 0.0
+        self.cancelled = False
+        self.done = False
+
+
+    def cancel( self ):
+        """Removes the task from the queue before its next step."""
+        self.cancelled = True
+
+
+    def _key( self, now ):
+        return self.priority - aging * ( now - self.waiting_since )
+
+
+    def _step( self ):
+        """Runs one step, returning True once the task is finished."""
+        if not isinstance( self.work, types.GeneratorType ):
+            result = self.work()
+            if not isinstance( result, types.GeneratorType ):
+                return True
+            # -- callables may return a generator to be stepped from then on
+            self.work = result
+
+        try:
+            delay = self.work.next()
+        except StopIteration:
+            return True
+
+        if isinstance( delay, ( int, float ) ) and delay > 0:
+            self.wake_at = time.time() + delay
+        return False
+
+
+_queue = []
+_counter = itertools.count()
+_job = None
+_timer = None
+_draining = False
+_batch = None
+
+_stats = {
+    'scheduled': 0,
+    'completed': 0,
+    'failed': 0,
+    'slices': 0,
+    'overruns': 0,
+    'busy_time': 0.0,
+}
+
+
+def _isBatch():
+    global _batch
+    if _batch is None:
+        _batch = bool( mc.about( batch=True ) )
+    return _batch
+
+
+def schedule( work, priority=NORMAL, name=None ):
+    """
+    Queues a callable or generator to run when Maya is idle, lowest priority
+    first. Returns the `Task`.
+    """
+    if name is None:
+        name = getattr( work, '__name__', None ) or repr( work )
+
+    task = Task( work, priority, name )
+    heapq.heappush( _queue, ( task._key( task.waiting_since ), _counter.next(), task ) )
+    _stats['scheduled'] += 1
+
+    if _isBatch():
+        if not _draining:
+            drain()
+    else:
+        _startJob()
+
+    return task
+
+
+def _startJob():
+    global _job
+    _cancelTimer()
+    if _job is None:
+        _job = mc.scriptJob( idleEvent=_runSlice )
+
+
+def _stopJob():
+    global _job
+    if _job is not None:
+        job, _job = _job, None
+        if mc.scriptJob( exists=job ):
+            mc.scriptJob( kill=job, force=True )
+
+
+def _startTimer( delay ):
+    """Re-arms the idle job after delay seconds."""
+    global _timer
+    _cancelTimer()
+    _timer = threading.Timer( delay, maya.utils.executeDeferred, ( _wake, ) )
+    _timer.daemon = True
+    _timer.start()
+
+
+def _cancelTimer():
+    global _timer
+    if _timer is not None:
+        timer, _timer = _timer, None
+        timer.cancel()
+
+
+def _wake():
+    global _timer
+    _timer = None
+    if _queue:
+        _startJob()
+
+
+def _runTask( task ):
+    """Runs one step of a task, returning True if it should be queued again."""
+    start = time.time()
+    try:
+        finished = task._step()
+    except Exception:
+        finished = True
+        _stats['failed'] += 1
+        sys.stderr.write( "# Scheduled task '%s' failed:\n" % task.name )
+        traceback.print_exc()
+    else:
+        if finished:
+            _stats['completed'] += 1
+    end = time.time()
+
+    task.steps += 1
+    task.runtime += end - start
+    _stats['busy_time'] += end - start
+
+    if finished:
+        task.done = True
+        return False
+
+    task.waiting_since = end
+    return True
+
+
+def _pop():
+    while _queue:
+        task = heapq.heappop( _queue )[2]
+        if not task.cancelled:
+            return task
+    return None
+
+
+def _push( task ):
+    heapq.heappush( _queue, ( task._key( task.waiting_since ), _counter.next(), task ) )
+
+
+def _age():
+    # -- refresh keys so tasks which have waited move up the queue
+    now = time.time()
+    _queue[:] = [ ( task._key( now ), count, task ) for key, count, task in _queue ]
+    heapq.heapify( _queue )
+
+
+def _runSlice():
+    """Runs queued tasks until the slice budget is spent."""
+    start = time.time()
+    deadline = start + budget
+
+    _age()
+
+    sleeping = []
+    while time.time() < deadline:
+        task = _pop()
+        if task is None:
+            break
+        if task.wake_at > time.time():
+            sleeping.append( task )
+        elif _runTask( task ):
+            _push( task )
+
+    for task in sleeping:
+        _push( task )
+
+    elapsed = time.time() - start
+    _stats['slices'] += 1
+    if elapsed > budget * 2:
+        _stats['overruns'] += 1
+
+    live = [ entry[2] for entry in _queue if not entry[2].cancelled ]
+    if not live:
+        del _queue[:]
+        _stopJob()
+        return
+
+    # -- with every task asleep, wait on a timer rather than spin on idle events
+    wake_at = min( task.wake_at for task in live )
+    if wake_at > time.time():
+        _stopJob()
+        _startTimer( wake_at - time.time() )
+
+
+def drain():
+    """Runs all queued tasks to completion, including tasks they schedule."""
+    global _draining
+
+    _draining = True
+    try:
+        while True:
+            task = _pop()
+            if task is None:
+                break
+
+            sleeping = []
+            while task is not None and task.wake_at > time.time():
+                sleeping.append( task )
+                task = _pop()
+
+            for other in sleeping:
+                _push( other )
+
+            if task is None:
+                # -- only sleeping tasks remain
+                time.sleep( max( 0.0, min( other.wake_at for other in sleeping ) - time.time() ) )
+            elif _runTask( task ):
+                _push( task )
+    finally:
+        _draining = False
+
+    _cancelTimer()
+    _stopJob()
+
+
+def queue():
+    """Gets a list of dicts describing the queued tasks, in the order they would run."""
+    now = time.time()
+    tasks = sorted( ( task._key( now ), count, task ) for key, count, task in _queue if not task.cancelled )
+
+    return [ { 'name': task.name, 'priority': task.priority, 'steps': task.steps, 'runtime': task.runtime,
+               'waiting': now - task.waiting_since } for key, count, task in tasks ]
+
+
+def stats():
+    """
+    Gets a dict counting 'queued', 'scheduled', 'completed' and 'failed' tasks,
+    idle 'slices' and 'overruns' of the budget, and the total 'busy_time'.
+    """
+    result = dict( _stats )
+    result['queued'] = len( [ entry for entry in _queue if not entry[2].cancelled ] )
+    return result
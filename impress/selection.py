@@ -0,0 +1,113 @@
+"""
+Module for resolving the nodes a command operates on.
+
+Node sources are strings stored by `models.NodeList` fields:
+
+- ``selection``: the active selection.
+- ``set:<name>``: members of an object set.
+- ``nodes:<name> <name> ...``: a stored list of nodes.
+
+Sources resolve through `maya.cmds` into tuples of node names, or `MObjectHandle`
+arrays, without constructing PyNodes. Within a `snapshot`, each source is only
+resolved once, so chained commands share the same nodes.
+"""
+
+from contextlib import contextmanager
+import maya.cmds as mc
+
+
+SELECTION = 'selection'
+SET_PREFIX = 'set:'
+NODES_PREFIX = 'nodes:'
+
+_snapshot = None
+
+
+def nodesSource( nodes ):
+    """Formats a list of node names as a stored source string."""
+    return NODES_PREFIX + ' '.join( nodes )
+
+
+def _ls( source, type=None, long=False ):
+    kwargs = { 'long': long }
+    if type:
+        kwargs['type'] = type
+
+    if source == SELECTION:
+        return mc.ls( selection=True, **kwargs ) or []
+    elif source.startswith( SET_PREFIX ):
+        name = source[len( SET_PREFIX ):]
+        if not mc.objExists( name ):
+            return []
+        members = mc.sets( name, query=True )
+        if not members:
+            return []
+        return mc.ls( members, **kwargs ) or []
+    elif source.startswith( NODES_PREFIX ):
+        names = source[len( NODES_PREFIX ):].split()
+        if not names:
+            return []
+        return mc.ls( names, **kwargs ) or []
+
+    raise ValueError( "Invalid node source: '%s'" % source )
+
+
+def _handles( names ):
+    import maya.api.OpenMaya as om
+
+    sel = om.MSelectionList()
+    for name in names:
+        sel.add( name )
+
+    return tuple( om.MObjectHandle( sel.getDependNode( i ) ) for i in xrange( sel.length() ) )
+
+
+def handleName( handle ):
+    """Gets the full path, or name, of the node of an `MObjectHandle`. Raises ValueError if it was deleted."""
+    import maya.api.OpenMaya as om
+
+    if not handle.isValid():
+        raise ValueError( "node no longer exists" )
+
+    node = handle.object()
+    if node.hasFn( om.MFn.kDagNode ):
+        return om.MDagPath.getAPathTo( node ).fullPathName()
+    return om.MFnDependencyNode( node ).name()
+
+
+def resolve( source, type=None, long=False, handles=False ):
+    """
+    Resolves a node source into a tuple of node names, or of `MObjectHandle`
+    if `handles` is True. Results are reused within a `snapshot`.
+    """
+    key = ( source, type, long, handles )
+
+    if _snapshot is not None:
+        try:
+            return _snapshot[key]
+        except KeyError:
+            pass
+
+    names = tuple( _ls( source, type, long ) )
+    result = _handles( names ) if handles else names
+
+    if _snapshot is not None:
+        _snapshot[key] = result
+
+    return result
+
+
+@contextmanager
+def snapshot():
+    """Reuses resolved node sources until the outermost snapshot exits."""
+    global _snapshot
+
+    if _snapshot is not None:
+        yield _snapshot
+        return
+
+    _snapshot = {}
+    try:
+        yield _snapshot
+    finally:
+        _snapshot = None
@@ -0,0 +1,81 @@
+"""
+Module for compiling option models into view specs.
+
+A spec holds everything about a model's presentation which does not change
+between views: titles, labels, varnames, static widget kwargs and enable
+dependencies. Specs are compiled once per model class and shared by every view.
+"""
+
+import utils
+import models
+
+
+_specs = {}
+
+
+class FieldSpec( object ):
+    """
+    Precomputed presentation data of a single field.
+    """
+
+    __slots__ = ( 'field', 'name', 'label', 'varname', 'widget_kwargs', 'requires' )
+
+    def __init__( self, field ):
+        self.field = field
+        self.name = field.name
+        self.label = getattr( field, 'widget_label', None )
+        self.varname = getattr( field, 'varname', None )
+        self.widget_kwargs = field.widgetKwargs() if hasattr( field, 'widgetKwargs' ) else {}
+        self.requires = getattr( field, 'requires', None )
+
+
+class ViewSpec( object ):
+    """
+    Precomputed presentation data of an option model class. A spec of None has
+    no fields, for views built without a model.
+    """
+
+    def __init__( self, optionmodel ):
+        model_class = optionmodel.__class__
+        meta = getattr( model_class, 'Meta', None )
+
+        self.model_class = model_class if optionmodel is not None else None
+        self.name = utils.niceName( model_class.__name__ + "View" )
+        self.title = getattr( meta, 'title', utils.niceName( model_class.__name__ ) )
+        self.help_tag = getattr( meta, 'help_tag', None )
+        self.button_label = getattr( meta, 'button_label', 'Apply/Close' )
+
+        self.fields = []
+        self.dependents = {}
+
+        for field in getattr( optionmodel, 'fields', () ):
+            spec = FieldSpec( field )
+            self.fields.append( spec )
+
+            if spec.requires:
+                self.dependents.setdefault( spec.requires[0].name, [] ).append( spec )
+
+
+    def __iter__( self ):
+        return iter( self.fields )
+
+
+def compileSpec( optionmodel ):
+    """Gets the cached `ViewSpec` of an option model class or instance, compiling it if needed."""
+
+    if optionmodel is None:
+        model_class = None
+    elif isinstance( optionmodel, models.Model ):
+        model_class = optionmodel.__class__
+    else:
+        model_class = optionmodel
+        optionmodel = None
+
+    try:
+        return _specs[model_class]
+    except KeyError:
+        if optionmodel is None and model_class is not None:
+            optionmodel = model_class()
+
+        spec = _specs[model_class] = ViewSpec( optionmodel )
+        return spec
@@ -0,0 +1,165 @@
+"""
+Module for storing all option values of a model in a single optionVar.
+
+Models opt in by setting ``storage = 'blob'`` in their Meta. Instead of one
+optionVar per field, the values are packed into one versioned json optionVar
+named ``<Model>_options``. The blob is decoded once per session, and written
+back on idle only after values change. Existing per-field optionVars are copied
+into the blob the first time it is loaded, and removed unless a field of another
+loaded model uses the same varname. Default varnames such as ``FloatField_size``
+are named after the field class, so two models with a ``size`` FloatField share
+one optionVar, which is then kept for the other model.
+"""
+
+import json
+import maya.cmds as mc
+import callbacks
+import scheduler
+import models
+
+
+VERSION = 1
+
+_stores = {}
+_quit_callback = False
+
+
+def _subclasses( cls ):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        for nested in _subclasses( subclass ):
+            yield nested
+
+
+class BlobStore( object ):
+    """
+    In-memory cache of a model's option values, flushed to a single optionVar
+    when dirty.
+    """
+
+    def __init__( self, model ):
+        self.model = model
+        self.varname = '%s_options' % model.__name__
+
+        self._values = None
+        self._dirty = False
+
+
+    def _fields( self ):
+        return [ field for field in self.model.__dict__.itervalues()
+                 if hasattr( field, 'varname' ) and field.name is not None ]
+
+
+    def _load( self ):
+        if self._values is not None:
+            return self._values
+
+        self._values = {}
+
+        if mc.optionVar( exists=self.varname ):
+            try:
+                blob = json.loads( mc.optionVar( query=self.varname ) )
+                if blob.get( 'version' ) != VERSION:
+                    raise ValueError( "unsupported version %s" % blob.get( 'version' ) )
+                self._values = blob['values']
+            except ( ValueError, KeyError, TypeError, AttributeError ), e:
+                mc.warning( "Could not read %s (%s), using defaults." % ( self.varname, e ) )
+        else:
+            self._migrate()
+
+        return self._values
+
+
+    def _isShared( self, field ):
+        """Gets whether a field's optionVar is also used by a field of another loaded model."""
+        for model in _subclasses( models.OptionModel ):
+            if model is not self.model:
+                for name, other in model.__dict__.iteritems():
+                    if not isinstance( other, models.OptionField ):
+                        continue
+                    # -- models not instantiated yet have unnamed fields, whose varname property must not be cached
+                    varname = other._varname or "%s_%s" % ( other.__class__.__name__, other.name or name )
+                    if varname == field.varname:
+                        return True
+        return False
+
+
+    def _migrate( self ):
+        # -- copy any per-field optionVars into the blob in one go
+        for field in self._fields():
+            if mc.optionVar( exists=field.varname ):
+                self._values[field.name] = mc.optionVar( query=field.varname )
+                if not self._isShared( field ):
+                    mc.optionVar( remove=field.varname )
+
+        if self._values:
+            self._markDirty()
+
+
+    def _markDirty( self ):
+        if self._dirty:
+            return
+
+        self._dirty = True
+        scheduler.schedule( self.flush, scheduler.LOW, name='%s.flush' % self.varname )
+
+
+    def exists( self, name ):
+        return name in self._load()
+
+
+    def get( self, name ):
+        """Gets a stored value, raising KeyError if the field has not been set."""
+        return self._load()[name]
+
+
+    def set( self, name, value ):
+        values = self._load()
+        if isinstance( value, tuple ):
+            value = list( value )
+
+        if name not in values or values[name] != value:
+            values[name] = value
+            self._markDirty()
+
+
+    def remove( self, name ):
+        if self._load().pop( name, None ) is not None:
+            self._markDirty()
+
+
+    def flush( self ):
+        """Writes the blob to its optionVar if values changed."""
+        if not self._dirty:
+            return
+
+        self._dirty = False
+        blob = { 'version': VERSION, 'values': self._values }
+        mc.optionVar( stringValue=( self.varname, json.dumps( blob, separators=( ',', ':' ) ) ) )
+
+
+def getStore( model ):
+    """Gets the `BlobStore` of a model class, or None if it uses per-field optionVars."""
+    global _quit_callback
+
+    try:
+        return _stores[model]
+    except KeyError:
+        pass
+
+    store = None
+    if model is not None and getattr( model.Meta, 'storage', None ) == 'blob':
+        store = BlobStore( model )
+        if not _quit_callback:
+            _quit_callback = True
+            callbacks.addCallback( 'quitApplication', flushAll )
+
+    _stores[model] = store
+    return store
+
+
+def flushAll():
+    """Writes all dirty blobs."""
+    for store in _stores.itervalues():
+        if store is not None:
+            store.flush()
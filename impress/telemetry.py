@@ -0,0 +1,277 @@
+"""
+Module for recording local usage and latency of registered commands.
+
+Invocations are buffered in memory and flushed on a worker thread to a fixed
+size ring buffer file per user, so recording never blocks Maya and the file
+never grows past `capacity` records. Files are locked while written, so several
+Maya sessions of one user can share a file. Files from many users can be merged with
+`aggregate` to see which commands are hot and how their latency trends.
+"""
+
+import os
+import time
+import struct
+import atexit
+import getpass
+import threading
+import maya.cmds as mc
+import register
+import utils
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+_MAGIC = 'IMPT'
+_VERSION = 1
+
+# -- magic, version, capacity, number of records written
+_HEADER = struct.Struct( '<4sIIQ' )
+
+# -- command key, timestamp, duration, success
+_RECORD = struct.Struct( '<64sdf?3x' )
+
+
+def _lock( f, exclusive ):
+    """Locks an open file against other processes, blocking until it is free."""
+    if fcntl is not None:
+        fcntl.lockf( f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH )
+    else:
+        # -- windows has no shared locks, so the first byte is locked exclusively
+        f.seek( 0 )
+        msvcrt.locking( f.fileno(), msvcrt.LK_LOCK, 1 )
+
+
+def _unlock( f ):
+    f.flush()
+    if fcntl is not None:
+        fcntl.lockf( f, fcntl.LOCK_UN )
+    else:
+        f.seek( 0 )
+        msvcrt.locking( f.fileno(), msvcrt.LK_UNLCK, 1 )
+
+
+def _encodeKey( key ):
+    # -- cut to the record's 64 bytes without splitting a multi-byte character
+    data = key.encode( 'utf-8' )
+    if len( data ) > 64:
+        data = data[:64].decode( 'utf-8', 'ignore' ).encode( 'utf-8' )
+    return data
+
+
+class RingBuffer( object ):
+    """
+    Fixed capacity file of invocation records, overwriting the oldest when full.
+    """
+
+    def __init__( self, path, capacity=50000 ):
+        self.path = path
+        self.capacity = capacity
+
+
+    def _open( self, exclusive ):
+        """Opens and locks the file, creating it if needed. Returns the file and number of records written."""
+        directory = os.path.dirname( self.path )
+        if directory and not os.path.isdir( directory ):
+            try:
+                os.makedirs( directory )
+            except OSError:
+                if not os.path.isdir( directory ):
+                    raise
+
+        # -- never truncate, another process may have created the file meanwhile
+        fd = os.open( self.path, os.O_RDWR | os.O_CREAT | getattr( os, 'O_BINARY', 0 ) )
+        f = os.fdopen( fd, 'r+b' )
+        try:
+            _lock( f, exclusive or fcntl is None )
+
+            f.seek( 0 )
+            header = f.read( _HEADER.size )
+            if not header:
+                header = _HEADER.pack( _MAGIC, _VERSION, self.capacity, 0 )
+                f.seek( 0 )
+                f.write( header )
+
+            magic, version, capacity, written = _HEADER.unpack( header )
+            if magic != _MAGIC or version != _VERSION:
+                raise IOError( "%s is not an impress telemetry file." % self.path )
+        except:
+            f.close()
+            raise
+
+        self.capacity = capacity
+        return f, written
+
+
+    def append( self, records ):
+        """Writes a list of (key, timestamp, duration, ok) records."""
+        f, written = self._open( True )
+        try:
+            for key, timestamp, duration, ok in records:
+                f.seek( _HEADER.size + ( written % self.capacity ) * _RECORD.size )
+                f.write( _RECORD.pack( _encodeKey( key ), timestamp, duration, ok ) )
+                written += 1
+
+            f.seek( 0 )
+            f.write( _HEADER.pack( _MAGIC, _VERSION, self.capacity, written ) )
+            _unlock( f )
+        finally:
+            f.close()
+
+
+    def read( self ):
+        """Gets the stored records, oldest first."""
+        if not os.path.exists( self.path ):
+            return []
+
+        f, written = self._open( False )
+        try:
+            count = min( written, self.capacity )
+            f.seek( _HEADER.size )
+            data = f.read( count * _RECORD.size )
+            _unlock( f )
+        finally:
+            f.close()
+
+        records = []
+        for i in xrange( len( data ) // _RECORD.size ):
+            key, timestamp, duration, ok = _RECORD.unpack_from( data, i * _RECORD.size )
+            records.append( ( key.rstrip( '\0' ).decode( 'utf-8', 'replace' ), timestamp, duration, ok ) )
+
+        # -- rotate so the oldest record is first
+        if written > self.capacity:
+            start = written % self.capacity
+            records = records[start:] + records[:start]
+
+        return records
+
+
+class Recorder( object ):
+    """
+    Buffers invocation records and flushes them to a `RingBuffer` on a worker
+    thread once `flush_size` records or `flush_interval` seconds accumulate.
+    """
+
+    def __init__( self, ring, flush_size=64, flush_interval=30.0 ):
+        self.ring = ring
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._last_flush = time.time()
+
+
+    def record( self, command, args, kwargs, duration, exc_info ):
+        now = time.time()
+
+        with self._lock:
+            self._buffer.append( ( command.key, now, duration, exc_info is None ) )
+            due = len( self._buffer ) >= self.flush_size or now - self._last_flush >= self.flush_interval
+
+        if due:
+            utils.threadPool().apply_async( self.flush )
+
+
+    def flush( self ):
+        """Writes buffered records to the ring buffer file."""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            self._last_flush = time.time()
+
+        if records:
+            with self._write_lock:
+                self.ring.append( records )
+
+
+_recorder = None
+
+
+def defaultPath():
+    """Gets the current user's telemetry file path in the user's app directory."""
+    return os.path.join( mc.internalVar( userAppDir=True ), 'impress', 'telemetry_%s.bin' % getpass.getuser() )
+
+
+def enable( path=None, capacity=50000 ):
+    """Starts recording command invocations."""
+    global _recorder
+
+    disable()
+
+    _recorder = Recorder( RingBuffer( path or defaultPath(), capacity ) )
+    register.addInvokeCallback( _recorder.record )
+
+
+def disable():
+    """Stops recording, flushing any buffered records."""
+    global _recorder
+
+    if _recorder is not None:
+        register.removeInvokeCallback( _recorder.record )
+        _recorder.flush()
+        _recorder = None
+
+
+def flush():
+    """Writes buffered records now."""
+    if _recorder is not None:
+        _recorder.flush()
+
+
+atexit.register( flush )
+
+
+def _percentile( sorted_values, percent ):
+    index = int( round( percent / 100.0 * ( len( sorted_values ) - 1 ) ) )
+    return sorted_values[index]
+
+
+def summarize( records ):
+    """
+    Gets a dict of command key to a dict of 'count', 'failures', 'p50', 'p95' and
+    'p99' latency in seconds, from a list of records.
+    """
+    durations = {}
+    failures = {}
+
+    for key, timestamp, duration, ok in records:
+        durations.setdefault( key, [] ).append( duration )
+        if not ok:
+            failures[key] = failures.get( key, 0 ) + 1
+
+    summary = {}
+    for key, values in durations.iteritems():
+        values.sort()
+        summary[key] = {
+            'count': len( values ),
+            'failures': failures.get( key, 0 ),
+            'p50': _percentile( values, 50 ),
+            'p95': _percentile( values, 95 ),
+            'p99': _percentile( values, 99 ),
+        }
+
+    return summary
+
+
+def aggregate( paths, since=None ):
+    """Merges the records of many users' telemetry files into one summary, optionally since a timestamp."""
+    records = []
+    for path in paths:
+        for record in RingBuffer( path ).read():
+            if since is None or record[1] >= since:
+                records.append( record )
+
+    return summarize( records )
+
+
+def printReport( summary ):
+    """Prints a summary, most invoked commands first."""
+    print '# %-50s %8s %8s %10s %10s %10s' % ( 'command', 'count', 'failed', 'p50', 'p95', 'p99' )
+
+    for key, stats in sorted( summary.iteritems(), key=lambda item: -item[1]['count'] ):
+        print '# %-50s %8d %8d %9.4fs %9.4fs %9.4fs' % ( key, stats['count'], stats['failures'],
+                                                     stats['p50'], stats['p95'], stats['p99'] )
@@ -2,10 +2,12 @@
 Contains custom Maya gui controls and functions.
 """
 
+import array
 import pymel.core as pm
 import pymel.versions as versions
 from pymel.util.path import Path as _Path
 import utils
+import profiler
 
 
 __fileDialog2_keys = ['dialogStyle', 'ds', 'caption', 'cap', 'startingDirectory', 'dir', 'fileFilter', 'ff', 'selectFileFilter', 'sff', 'fileMode', 'fm', 'okCaption', 'okc', 'cancelCaption', 'cc', 'returnFilter', 'rf', 'optionsUICreate', 'ocr', 'optionsUIInit', 'oin', 'fileTypeChanged', 'ftc', 'selectionChanged', 'sc', 'optionsUICommit', 'ocm']
@@ -178,6 +180,124 @@ def fileBrowserGrp( *args, **kwargs ):
         return control
 
 
+_array_controls = {}
+
+
+def _arraySummary( values ):
+    if not len( values ):
+        return 'Empty'
+    return '%d values  [%g .. %g]' % ( len( values ), min( values ), max( values ) )
+
+
+def _formatValue( value ):
+    # -- repr round-trips floats exactly, so applying unchanged text keeps the values
+    return repr( value ) if isinstance( value, float ) else str( value )
+
+
+def _editArrayValues( control ):
+    state = _array_controls[control]
+    values = state['values']
+
+    window = pm.window( title=state['label'] or 'Edit Values', widthHeight=( 400, 300 ) )
+    form = pm.formLayout()
+    field = pm.scrollField( wordWrap=True, text=' '.join( _formatValue( v ) for v in values ) )
+
+    def apply( *args ):
+        text = field.getText().replace( ',', ' ' )
+        try:
+            parsed = [ float( v ) for v in text.split() ]
+        except ValueError:
+            pm.mel.warning( "Values must be numbers separated by spaces." )
+            return
+
+        if hasattr( values, 'dtype' ):
+            import numpy
+            new_values = numpy.asarray( parsed, dtype=values.dtype )
+        elif isinstance( values, array.array ):
+            cast = float if values.typecode in 'fd' else int
+            new_values = array.array( values.typecode, [ cast( v ) for v in parsed ] )
+        else:
+            new_values = parsed
+
+        arrayFieldGrp( control, edit=True, values=new_values )
+        pm.deleteUI( window )
+
+        if state['changeCommand'] is not None:
+            state['changeCommand']( new_values )
+
+    ok = pm.button( label='OK', command=apply )
+    cancel = pm.button( label='Cancel', command=lambda *args: pm.deleteUI( window ) )
+
+    pm.formLayout( form, edit=True,
+                   attachForm=[( field, 'top', 4 ), ( field, 'left', 4 ), ( field, 'right', 4 ),
+                               ( ok, 'left', 4 ), ( ok, 'bottom', 4 ), ( cancel, 'right', 4 ), ( cancel, 'bottom', 4 )],
+                   attachControl=[( field, 'bottom', 4, ok )],
+                   attachPosition=[( ok, 'right', 2, 50 ), ( cancel, 'left', 2, 50 )] )
+
+    pm.showWindow( window )
+
+
+def arrayFieldGrp( *args, **kwargs ):
+    """
+    Row with a label, a summary of an array of numbers and a button which opens a
+    text editor for the values, so large arrays need no control per element.
+
+    Supports the `label`, `values`, `changeCommand`, `enable` and `annotation`
+    flags. Remaining create flags are passed to `rowLayout`.
+    """
+
+    edit = kwargs.pop( 'edit', kwargs.pop( 'e', False ) )
+    query = kwargs.pop( 'query', kwargs.pop( 'q', False ) )
+
+    if query:
+        control = unicode( args[0] )
+        if kwargs.get( 'values' ):
+            return _array_controls[control]['values']
+        elif kwargs.get( 'enable' ):
+            return pm.rowLayout( control, query=True, enable=True )
+        return pm.rowLayout( control, query=True, **kwargs )
+
+    if edit:
+        control = unicode( args[0] )
+        state = _array_controls[control]
+
+        if 'values' in kwargs:
+            state['values'] = kwargs.pop( 'values' )
+            pm.text( state['summary'], edit=True, label=_arraySummary( state['values'] ) )
+        if 'changeCommand' in kwargs:
+            state['changeCommand'] = kwargs.pop( 'changeCommand' )
+        if kwargs:
+            pm.rowLayout( control, edit=True, **kwargs )
+        return
+
+    label = kwargs.pop( 'label', '' )
+    values = kwargs.pop( 'values', [] )
+    changeCommand = kwargs.pop( 'changeCommand', kwargs.pop( 'cc', None ) )
+    annotation = kwargs.pop( 'annotation', kwargs.pop( 'ann', '' ) )
+
+    kwargs.setdefault( 'adjustableColumn', 2 )
+    kwargs.setdefault( 'columnAttach3', ( 'right', 'left', 'left' ) )
+    kwargs.setdefault( 'columnOffset3', ( 0, 6, 6 ) )
+    row = pm.rowLayout( *args, numberOfColumns=3, **kwargs )
+    control = unicode( row )
+
+    pm.text( label=label, annotation=annotation )
+    summary = pm.text( label=_arraySummary( values ), align='left', annotation=annotation )
+    pm.button( label='Edit...', command=lambda *args: _editArrayValues( control ) )
+    pm.setParent( '..' )
+
+    _array_controls[control] = {
+        'label': label,
+        'values': values,
+        'summary': summary,
+        'changeCommand': changeCommand,
+    }
+    pm.scriptJob( uiDeleted=[control, lambda: _array_controls.pop( control, None )], runOnce=True )
+
+    return row
+
+
+@profiler.traced( 'menu' )
 def commandMenuItem( command, args=[], label=None, annotation=None, **kwargs ):
     """
     Creates menuItem from python function objects.
@@ -220,7 +340,9 @@ def commandMenuItem( command, args=[], label=None, annotation=None, **kwargs ):
 
         argStr = ','.join( argList )
 
-    if hasattr( command, 'func' ):
+    if hasattr( command, 'get_dispatch_str' ):
+        command_str = command.get_dispatch_str( *args )
+    elif hasattr( command, 'func' ):
         command_str = '%s.%s(%s)' % ( command.func.__module__, command.__name__, argStr )
     else:
         command_str = '%s.%s(%s)' % ( command.__module__, command.__name__, argStr )
@@ -249,7 +371,7 @@ def commandMenuItem( command, args=[], label=None, annotation=None, **kwargs ):
 
     if hasattr( command, 'optionmodel' ):
         if command.optionmodel is not None:
-            optCmdStr = command_str.split( '(' )[0] + '(1)'
+            optCmdStr = command.get_dispatch_str( 1 )
             optAnn = label + ' Options'
 
             optItem = _initMenuItem( command=optCmdStr, annotation=optAnn, optionBox=True, **kwargs )
@@ -5,12 +5,46 @@ Contains helper and non-Maya-specific functions.
 import re
 import platform
 import subprocess
+import functools
+import multiprocessing
 from pymel.util.path import Path as _Path
 
 
+_thread_pool = None
+
+def threadPool():
+    """Gets a pool of worker threads shared by impress, created on first use."""
+    global _thread_pool
+
+    if _thread_pool is None:
+        from multiprocessing.pool import ThreadPool
+        _thread_pool = ThreadPool( max( 4, multiprocessing.cpu_count() ) )
+
+    return _thread_pool
+
+
+def memoize( func ):
+    """Decorator caching results of functions which take hashable positional args."""
+
+    cache = {}
+
+    @functools.wraps( func )
+    def wrapper( *args ):
+        try:
+            return cache[args]
+        except KeyError:
+            result = cache[args] = func( *args )
+            return result
+
+    wrapper.cache = cache
+
+    return wrapper
+
+
 _re_words = re.compile( '([A-Z][a-z0-9]+)' )
 _re_numbers = re.compile( '([0-9]+)' )
 
+@memoize
 def niceName( name ):
     """Formats "camelCase" and "wide_name" variable names into "Nice Name"."""
 
@@ -29,6 +63,7 @@ def niceName( name ):
     return result
 
 
+@memoize
 def wideName( name ):
     """Formats "camelCase" and "Nice Name" variable names into "wide_name"."""
 
@@ -37,6 +72,7 @@ def wideName( name ):
     return result
 
 
+@memoize
 def camelCase( name ):
     """Formats "Nice Name" and "wide_name" variable names into "camelCase"."""
 
@@ -45,6 +81,7 @@ def camelCase( name ):
     return result
 
 
+@memoize
 def pascalCase( name ):
     """Formats strings into "PascalCase"."""
 
@@ -2,20 +2,84 @@
 Views intended to be populated with models.
 """
 
+import time
+import weakref
 import pymel.core as pm
-import utils
 import models
+import specs
+import selection
+import scheduler
+
+
+_live_views = weakref.WeakSet()
+
+#: Views which have been shown, kept alive until their teardown, since gui
+#: controls only hold weak callbacks to them.
+_open_views = set()
+
+
+class WeakCallback( object ):
+    """
+    Gui callback which calls a method of a view through a weak reference, so
+    controls which outlive the view do not keep it, its model and fields alive.
+    """
+
+    _instances = weakref.WeakSet()
+
+    def __init__( self, view, method, *args ):
+        self._ref = weakref.ref( view )
+        self.method = method
+        self.args = args
+
+        WeakCallback._instances.add( self )
+
+
+    def __call__( self, *args ):
+        view = self._ref() if self._ref is not None else None
+        if view is not None:
+            return getattr( view, self.method )( *self.args )
+
+
+    @property
+    def alive( self ):
+        return self._ref is not None and self._ref() is not None
+
+
+    def release( self ):
+        """Detaches the callback from its view."""
+        self._ref = None
+
+
+def stats():
+    """
+    Gets a dict counting live 'views', shown 'open_views', 'callbacks' still
+    held by gui controls, and 'bound_callbacks' which are still attached to a
+    live view.
+    """
+    callbacks = list( WeakCallback._instances )
+    return {
+        'views': len( _live_views ),
+        'open_views': len( _open_views ),
+        'callbacks': len( callbacks ),
+        'bound_callbacks': len( [ cb for cb in callbacks if cb.alive ] ),
+    }
 
 
 class BaseView( object ):
     """
     The base view which handles bulding and updating option controls.
+
+    Gui callbacks should be created with `_callback` so that `teardown` can
+    release them when the view's controls are deleted. Views call `_keepAlive`
+    when shown, so they outlive the call which showed them.
     """
 
     def __init__( self, optionmodel ):
 
+        self._callbacks = []
+        _live_views.add( self )
+
         self.optionmodel = optionmodel
-        self.name = utils.niceName( self.optionmodel.__class__.__name__ + "View" )
 
         if self.optionmodel is not None:
             if not isinstance( optionmodel, models.OptionModel ) and not issubclass( optionmodel, models.OptionModel ):
@@ -23,61 +87,220 @@ class BaseView( object ):
             elif not hasattr( self.optionmodel, 'fields' ):
                 self.optionmodel = self.optionmodel()
 
+        self.spec = specs.compileSpec( self.optionmodel )
+        self.name = self.spec.name
+
+
+    def _callback( self, method, *args ):
+        """Creates a `WeakCallback` to a method of this view."""
+        callback = WeakCallback( self, method, *args )
+        self._callbacks.append( callback )
+        return callback
+
+
+    def _onFieldChange( self ):
+        self._updateOptions()
+        self._updateWidgets()
+
 
     def _buildWidgets( self, parent ):
-        for field in self.optionmodel.fields:
+        for spec in self.spec.fields:
+            field = spec.field
             pm.setParent( parent )
             if hasattr( field, 'updateWidget'):
-                field.buildWidget( changeCommand=lambda * args: ( self._updateOptions(), self._updateWidgets() ) )
+                field.buildWidget( spec=spec, changeCommand=self._callback( '_onFieldChange' ) )
             elif hasattr( field, 'buildWidget'):
-                field.buildWidget()
+                field.buildWidget( spec=spec )
+
+
+    def _keepAlive( self ):
+        """Holds the view until `teardown`."""
+        _open_views.add( self )
+
+
+    def _watchDeletion( self, control ):
+        """Tears down the view once control is deleted."""
+        pm.scriptJob( uiDeleted=[control, self._callback( 'teardown' )], runOnce=True )
 
 
-    def _updateWidgets( self ):
-        for field in self.optionmodel.fields:
+    def _updateWidgets( self, names=None ):
+        """
+        Updates field controls. If a list of field names is supplied, only those
+        fields and the fields which require them are updated.
+        """
+        if names is None:
+            fields = self.optionmodel.fields
+        else:
+            names = set( names )
+            for name in list( names ):
+                names.update( spec.name for spec in self.spec.dependents.get( name, () ) )
+            fields = [ field for field in self.optionmodel.fields if field.name in names ]
+
+        for field in fields:
             if hasattr( field, 'updateWidget'):
                 field.updateWidget()
 
 
     def _updateOptions( self, forceDefaults=False ):
-        if forceDefaults:
-            for field in self.optionmodel.fields:
-                if hasattr( field, 'setDefault'):
-                    field.setDefault()
-        else:
-            for field in self.optionmodel.fields:
-                if hasattr( field, 'set'):
-                    field.set( field.getWidgetValue() )
+        with models.transaction():
+            if forceDefaults:
+                for field in self.optionmodel.fields:
+                    if hasattr( field, 'setDefault'):
+                        field.setDefault()
+            else:
+                for field in self.optionmodel.fields:
+                    if hasattr( field, 'set'):
+                        # -- an invalid control value only skips its own field
+                        try:
+                            field.set( field.getWidgetValue() )
+                        except ValueError, e:
+                            pm.mel.warning( "%s was not saved: %s" % ( field.name, e ) )
+
+
+    def applyPreset( self, name ):
+        """Applies the named preset to the model and refreshes the controls which changed."""
+        self._updateWidgets( self.optionmodel.applyPreset( name ) )
 
 
     def show(self):
         pass
 
 
+    def teardown( self ):
+        """Releases gui callbacks and the fields' references to deleted controls."""
+        for callback in self._callbacks:
+            callback.release()
+        self._callbacks = []
+
+        if self.optionmodel is not None:
+            for field in self.optionmodel.fields:
+                if hasattr( field, 'releaseWidget' ):
+                    field.releaseWidget()
+
+        _live_views.discard( self )
+        _open_views.discard( self )
+
+
     def hide(self):
-        del(self)
+        self.teardown()
 
 
 class OptionBoxView( BaseView ):
     """
     View that hooks into Maya's built-in Option Box window.
+
+    Setting `live_preview` in the model's Meta re-runs the command whenever a
+    field changes, at most once per `preview_interval` seconds. Each preview is
+    undone before the next one runs. If `preview_arg` is set, that kwarg is passed
+    as True to preview runs so the function can reduce quality. Otherwise applying
+    keeps the last preview instead of running the command again.
     """
 
+    _preview_chunk = 'impressLivePreview'
+
     def __init__( self, optionmodel, command ):
         super(OptionBoxView, self).__init__(optionmodel)
 
         self.command = command
 
-        # -- read Meta data
-        self._title = getattr( self.optionmodel.Meta, 'title', utils.niceName( self.optionmodel.__class__.__name__ ) )
-        self._help_tag = getattr( self.optionmodel.Meta, 'help_tag', '%sHelp' % self.command.func_name )
-        self._button_label = getattr( self.optionmodel.Meta, 'button_label', 'Apply/Close' )
+        # -- read Meta data from compiled spec
+        self._title = self.spec.title
+        self._help_tag = self.spec.help_tag or '%sHelp' % self.command.func_name
+        self._button_label = self.spec.button_label
+        self._use_presets = getattr( self.optionmodel.Meta, 'presets', False )
+
+        self._live_preview = getattr( self.optionmodel.Meta, 'live_preview', False )
+        self._preview_interval = getattr( self.optionmodel.Meta, 'preview_interval', 1.0 / 24 )
+        self._preview_arg = getattr( self.optionmodel.Meta, 'preview_arg', None )
+        self._preview_kwargs = None
+        self._preview_pending = False
+        self._preview_time = 0.0
+        self._preview_call = None
+        self._preview_callback = self._callback( '_previewTask' )
+
+
+    def _onFieldChange( self ):
+        super( OptionBoxView, self )._onFieldChange()
+
+        if self._live_preview:
+            self._schedulePreview()
+
+
+    def _schedulePreview( self ):
+        if not self._preview_pending:
+            self._preview_pending = True
+            scheduler.schedule( self._preview_callback, scheduler.HIGH, name='%s.preview' % self.name )
+
+
+    def _previewTask( self ):
+        # -- throttle to one preview per interval, coalescing changes in between
+        delay = self._preview_time + self._preview_interval - time.time()
+        if delay > 0:
+            yield delay
+
+        self._runPreview()
+
+
+    def _runPreview( self ):
+        if not self._preview_pending:
+            return
+
+        self._preview_pending = False
+        self._rollbackPreview()
+
+        with selection.snapshot():
+            kwargs = self.command._get_kwargs()
+            if kwargs is None:
+                return
+
+            call_kwargs = self.command._resolve_kwargs( kwargs )
+            if self._preview_arg is not None:
+                call_kwargs[self._preview_arg] = True
+
+            # -- previews are only reported to invoke callbacks once committed
+            pm.undoInfo( openChunk=True, chunkName=self._preview_chunk )
+            start = time.time()
+            try:
+                self.command._call( **call_kwargs )
+            finally:
+                pm.undoInfo( closeChunk=True )
+
+        self._preview_kwargs = kwargs
+        self._preview_time = time.time()
+        self._preview_call = ( call_kwargs, self._preview_time - start )
+
+
+    def _rollbackPreview( self ):
+        """Undoes the last preview, if nothing else was done since."""
+        if self._preview_kwargs is not None:
+            self._preview_kwargs = None
+            if pm.undoInfo( query=True, undoName=True ) == self._preview_chunk:
+                pm.undo()
+
+
+    def _commitPreview( self ):
+        """Keeps the last preview if it ran at full quality with the current options."""
+        if self._preview_kwargs is None or self._preview_arg is not None or self._preview_pending:
+            return False
+
+        if self.command._get_kwargs() != self._preview_kwargs:
+            return False
+
+        # -- the kept preview is the apply, so journal and telemetry record it as one
+        call_kwargs, duration = self._preview_call
+        self.command._report( (), call_kwargs, duration )
+
+        print "# Result: %s #" % self.command.get_cmd_str( **self._preview_kwargs )
+        self._preview_kwargs = None
+        return True
 
 
     def _onClickApply(self, close=False):
         self._updateOptions()
 
-        self.command.__call__()
+        if not self._commitPreview():
+            self._rollbackPreview()
+            self.command.__call__()
 
         if hasattr(self.command, 'get_cmd_str'):
             pm.repeatLast( addCommand='python("%s")' % self.command.get_cmd_str(), addCommandLabel=self.command.__name__ )
@@ -86,6 +309,11 @@ class OptionBoxView( BaseView ):
             self.hide()
 
 
+    def _onReset( self ):
+        self._updateOptions( forceDefaults=True )
+        self._updateWidgets()
+
+
     def _updateButtons( self ):
         applyCloseBtn = pm.mel.getOptionBoxApplyAndCloseBtn()
         applyBtn = pm.mel.getOptionBoxApplyBtn()
@@ -94,19 +322,70 @@ class OptionBoxView( BaseView ):
         reseMenuItem = pm.getMelGlobal( 'string', 'gOptionBoxEditMenuResetItem' )
 
         pm.button( applyCloseBtn, edit=True, label=self._button_label,
-                   command=lambda *args: self._onClickApply(True)
+                   command=self._callback( '_onClickApply', True )
                    )
         pm.button( applyBtn, edit=True,
-                   command=lambda *args: self._onClickApply()
+                   command=self._callback( '_onClickApply' )
                    )
         pm.menuItem( saveMenuItem, edit=True,
-                     command=lambda * args: ( self._updateOptions() )
+                     command=self._callback( '_updateOptions' )
                      )
         pm.menuItem( reseMenuItem, edit=True,
-                     command=lambda * args: ( self._updateOptions( forceDefaults=True ), self._updateWidgets() )
+                     command=self._callback( '_onReset' )
                     )
 
 
+    def _buildPresetControls( self, parent ):
+        pm.setParent( parent )
+
+        self._presetMenu = pm.optionMenuGrp( label='Preset', changeCommand=self._callback( '_onSelectPreset' ) )
+        self._updatePresetMenu()
+
+        pm.setParent( parent )
+        pm.rowLayout( numberOfColumns=2 )
+        pm.button( label='Save Preset...', command=self._callback( '_onSavePreset' ) )
+        pm.button( label='Delete Preset', command=self._callback( '_onDeletePreset' ) )
+
+        pm.setParent( parent )
+        pm.separator( style='in', height=14 )
+
+
+    def _updatePresetMenu( self, selected=None ):
+        menu = '%s|OptionMenu' % self._presetMenu
+        pm.optionMenu( menu, edit=True, deleteAllItems=True )
+
+        for name in [''] + sorted( set( self.optionmodel.presets() + self.optionmodel.studioPresets() ) ):
+            pm.menuItem( label=name, parent=menu )
+
+        if selected:
+            self._presetMenu.setValue( selected )
+
+
+    def _onSelectPreset( self ):
+        name = self._presetMenu.getValue()
+        if name:
+            self.applyPreset( name )
+
+
+    def _onSavePreset( self ):
+        result = pm.promptDialog( title='Save Preset', message='Preset Name:',
+                                  button=['Save', 'Cancel'], defaultButton='Save',
+                                  cancelButton='Cancel', dismissString='Cancel' )
+        if result == 'Save':
+            name = pm.promptDialog( query=True, text=True ).strip()
+            if name:
+                self._updateOptions()
+                self.optionmodel.savePreset( name )
+                self._updatePresetMenu( name )
+
+
+    def _onDeletePreset( self ):
+        name = self._presetMenu.getValue()
+        if name:
+            self.optionmodel.deletePreset( name )
+            self._updatePresetMenu()
+
+
     def show(self):
         self.layout = pm.mel.getOptionBox()
 
@@ -114,6 +393,10 @@ class OptionBoxView( BaseView ):
         pm.setUITemplate( 'DefaultTemplate', pushTemplate=True )
 
         self.parentCol = pm.columnLayout( adjustableColumn=1 )
+        self._watchDeletion( self.parentCol )
+        self._keepAlive()
+        if self._use_presets:
+            self._buildPresetControls( parent=self.parentCol )
         self._buildWidgets( parent=self.parentCol )
         self._updateWidgets()
 
@@ -128,4 +411,10 @@ class OptionBoxView( BaseView ):
 
     def hide(self):
         pm.mel.hideOptionBox()
-        super(OptionBoxView, self).hide()
\ No newline at end of file
+        super(OptionBoxView, self).hide()
+
+    def teardown( self ):
+        # -- closing without applying discards the preview
+        self._preview_pending = False
+        self._rollbackPreview()
+        super( OptionBoxView, self ).teardown()
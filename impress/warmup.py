@@ -0,0 +1,138 @@
+"""
+Module for warming up a user's most used commands after startup.
+
+When enabled, invocations of registered commands are counted per user in an
+optionVar. Once Maya is idle after startup, the modules of the most used
+commands are imported, and their option models and view specs prepared, in
+low priority `scheduler` tasks within a time budget. The first use of those
+tools then costs about the same as any later use.
+
+Enable it from ``userSetup.py``::
+
+    from impress import warmup
+    warmup.enable()
+"""
+
+import sys
+import json
+import time
+import maya.cmds as mc
+import register
+import scheduler
+import specs
+
+
+COUNTS_VARNAME = 'impress_warmupCounts'
+
+_counts = None
+_dirty = False
+
+
+def _loadCounts():
+    global _counts
+
+    if _counts is None:
+        _counts = {}
+        if mc.optionVar( exists=COUNTS_VARNAME ):
+            try:
+                _counts = dict( json.loads( mc.optionVar( query=COUNTS_VARNAME ) ) )
+            except ( ValueError, TypeError ):
+                pass
+
+    return _counts
+
+
+def _saveCounts():
+    global _dirty
+
+    if _dirty:
+        _dirty = False
+        mc.optionVar( stringValue=( COUNTS_VARNAME, json.dumps( _counts, separators=( ',', ':' ) ) ) )
+
+
+def _markDirty():
+    global _dirty
+
+    if not _dirty:
+        _dirty = True
+        scheduler.schedule( _saveCounts, scheduler.LOW, name='warmup.saveCounts' )
+
+
+def _record( command, args, kwargs, duration, exc_info ):
+    counts = _loadCounts()
+    counts[command.key] = counts.get( command.key, 0 ) + 1
+    _markDirty()
+
+
+def counts():
+    """Gets a list of (command key, invocation count), most used first."""
+    return sorted( _loadCounts().iteritems(), key=lambda item: ( -item[1], item[0] ) )
+
+
+def reset():
+    """Forgets all recorded invocations."""
+    global _counts, _dirty
+
+    _counts = {}
+    _dirty = False
+    mc.optionVar( remove=COUNTS_VARNAME )
+
+
+def _warmCommand( key ):
+    try:
+        command = register.getCommand( key )
+    except Exception, e:
+        # -- forget commands which no longer exist
+        sys.stderr.write( "# Warm-up: skipping '%s': %s\n" % ( key, e ) )
+        _loadCounts().pop( key, None )
+        _markDirty()
+        return
+
+    optionmodel = getattr( command, 'optionmodel', None )
+    if optionmodel is not None:
+        specs.compileSpec( optionmodel )
+        optionmodel.resolve()
+
+
+def _warmTask( keys, budget, delay ):
+    if delay:
+        yield delay
+
+    spent = 0.0
+    for key in keys:
+        if spent >= budget:
+            break
+
+        start = time.time()
+        _warmCommand( key )
+        spent += time.time() - start
+        yield
+
+
+def warm( keys, budget=2.0, delay=0.0 ):
+    """
+    Schedules importing and preparing the commands with the given keys, in order,
+    until `budget` seconds have been spent. Returns the `scheduler.Task`.
+    """
+    return scheduler.schedule( _warmTask( list( keys ), budget, delay ), scheduler.LOW, name='warmup' )
+
+
+def enable( top=10, budget=2.0, delay=5.0 ):
+    """
+    Starts counting command invocations, and schedules warming up the `top`
+    most used commands `delay` seconds after Maya is idle.
+    """
+    register.addInvokeCallback( _record )
+
+    # -- batch sessions would only drain the warm-up synchronously
+    if mc.about( batch=True ):
+        return None
+
+    keys = [ key for key, count in counts()[:top] if key not in register.commands ]
+    if keys:
+        return warm( keys, budget, delay )
+
+
+def disable():
+    """Stops counting command invocations."""
+    register.removeInvokeCallback( _record )
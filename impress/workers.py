@@ -0,0 +1,180 @@
+"""
+Module for offloading pure-Python computation from Maya's main thread.
+
+A phased function declares three phases:
+
+- gather: runs on the main thread, queries Maya and returns a list of items.
+- compute: runs on worker threads or processes over chunks of items. Must not
+  call Maya commands, and must be a module level function to use processes.
+- apply: runs on the main thread with the computed results, in item order.
+
+Worker threads are the default, and keep Maya responsive while computing, but
+only run in parallel when compute releases the GIL, e.g. numpy or I/O.
+Pure-Python compute needs ``processes=True`` to use more than one core. The
+process pool is created once and reused; on Linux and macOS its workers are
+forked from the running Maya session, so create it early, before the scene
+grows large.
+
+Phased functions are callable, so they can be registered with a `PerformCommand`
+like any other function::
+
+    def relaxChunk( points ):
+        return [ relaxPoint( point ) for point in points ]
+
+    def setPoints( results, mesh='' ):
+        for i, point in enumerate( results ):
+            mc.xform( '%s.vtx[%d]' % ( mesh, i ), translation=point, worldSpace=True )
+
+    @workers.phased( compute=relaxChunk, apply=setPoints )
+    def relaxMesh( mesh='' ):
+        points = mc.xform( mesh + '.vtx[*]', query=True, translation=True, worldSpace=True )
+        return zip( points[0::3], points[1::3], points[2::3] )
+
+    performRelaxMesh = register.PerformCommand( relaxMesh, RelaxMeshOptions )
+
+If the user cancels from the progress window, the apply phase is skipped.
+"""
+
+import os
+import sys
+import threading
+import multiprocessing
+import maya.cmds as mc
+import utils
+
+
+class Cancelled( Exception ):
+    """Raised when a phased function is cancelled by the user."""
+
+
+def _computeChunk( args ):
+    compute, chunk, cancel = args
+    if cancel is not None and cancel.is_set():
+        return None
+    return list( compute( chunk ) )
+
+
+def _processPool( processes ):
+    # -- sys.executable is the Maya gui binary, child processes need mayapy
+    executable = os.path.join( os.path.dirname( sys.executable ), 'mayapy' )
+    if sys.platform == 'win32':
+        executable += '.exe'
+    if os.path.exists( executable ):
+        multiprocessing.set_executable( executable )
+
+    return multiprocessing.Pool( processes )
+
+
+_process_pool = None
+
+def processPool():
+    """Gets the pool of worker processes shared by phased functions, created on first use."""
+    global _process_pool
+
+    if _process_pool is None:
+        _process_pool = _processPool( None )
+
+    return _process_pool
+
+
+def _discardProcessPool():
+    # -- workers may still be computing, so they are killed rather than reused
+    global _process_pool
+
+    if _process_pool is not None:
+        pool, _process_pool = _process_pool, None
+        pool.terminate()
+        pool.join()
+
+
+class PhasedFunction( object ):
+    """
+    Callable running a gather phase and apply phase on the main thread, with the
+    compute phase between them spread over a pool of workers.
+    """
+
+    def __init__( self, gather, compute, apply, chunk_size=None, processes=False ):
+        self.gather = gather
+        self.compute = compute
+        self.apply = apply
+        self.chunk_size = chunk_size
+        self.processes = processes
+
+        self.__name__ = gather.__name__
+        self.__module__ = gather.__module__
+        self.__doc__ = gather.__doc__
+
+
+    def _chunks( self, items ):
+        size = self.chunk_size
+        if size is None:
+            size = max( 1, len( items ) // ( multiprocessing.cpu_count() * 4 ) )
+
+        return [ items[i:i + size] for i in xrange( 0, len( items ), size ) ]
+
+
+    def __call__( self, **kwargs ):
+        try:
+            return self.run( **kwargs )
+        except Cancelled, e:
+            mc.warning( str( e ) )
+
+
+    def run( self, **kwargs ):
+        """Runs all phases, raising `Cancelled` if the user cancels."""
+        items = list( self.gather( **kwargs ) )
+        chunks = self._chunks( items )
+
+        if self.processes:
+            pool = processPool()
+            cancel = None
+        else:
+            pool = utils.threadPool()
+            cancel = threading.Event()
+
+        interactive = not mc.about( batch=True )
+        if interactive:
+            mc.progressWindow( title=utils.niceName( self.__name__ ), status='Computing...',
+                               progress=0, maxValue=max( 1, len( chunks ) ), isInterruptable=True )
+
+        results = []
+        try:
+            computed = pool.imap( _computeChunk, [ ( self.compute, chunk, cancel ) for chunk in chunks ] )
+
+            for i in xrange( len( chunks ) ):
+                while True:
+                    try:
+                        results.extend( computed.next( 0.05 ) )
+                        break
+                    except multiprocessing.TimeoutError:
+                        if interactive and mc.progressWindow( query=True, isCancelled=True ):
+                            raise Cancelled( "%s was cancelled." % self.__name__ )
+
+                if interactive:
+                    mc.progressWindow( edit=True, progress=i + 1 )
+
+        except:
+            # -- stop the chunks still queued or computing on failure or cancel
+            if cancel is not None:
+                cancel.set()
+            else:
+                _discardProcessPool()
+            raise
+
+        finally:
+            if interactive:
+                mc.progressWindow( endProgress=True )
+
+        return self.apply( results, **kwargs )
+
+
+def phased( compute, apply, chunk_size=None, processes=False ):
+    """
+    Decorator making a gather function into a `PhasedFunction` with the supplied
+    compute and apply phases.
+    """
+
+    def decorator( gather ):
+        return PhasedFunction( gather, compute, apply, chunk_size, processes )
+
+    return decorator
@@ -0,0 +1,359 @@
+"""
+In-memory stand-in for the parts of ``maya.cmds``, ``maya.utils`` and
+``pymel.core`` which impress uses, so its modules can be tested with a plain
+Python interpreter::
+
+    python -m unittest discover -s tests
+
+Importing this module installs the fakes in `sys.modules` and puts the impress
+package directory on the path, so tests import modules the way impress does
+(``import models``). Call `reset` in setUp to start from an empty session.
+"""
+
+import os
+import sys
+import types
+import threading
+
+
+IMPRESS_DIR = os.path.join( os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) ), 'impress' )
+
+
+class Session( object ):
+    """State of the fake Maya session."""
+
+    def __init__( self ):
+        self.batch = True
+        self.optionvars = {}
+        self.nodes = {}
+        self.selection = []
+        self.sets = {}
+        self.jobs = {}
+        self.deferred = []
+        self.calls = []
+        self.warnings = []
+        self.undo = []
+        self.handlers = {}
+
+        self._job_ids = iter( xrange( 1, 1 << 30 ) )
+        self._lock = threading.Lock()
+
+
+    def newJob( self, kwargs ):
+        job = self._job_ids.next()
+        self.jobs[job] = kwargs
+        return job
+
+
+session = Session()
+
+
+def reset():
+    """Starts a new, empty session in batch mode."""
+    global session
+    session = Session()
+
+    # -- script jobs died with the old session, so impress must create new ones
+    callbacks = sys.modules.get( 'callbacks' )
+    if callbacks is not None:
+        callbacks._callbacks.clear()
+        callbacks._jobs.clear()
+
+
+def setBatch( batch ):
+    session.batch = batch
+
+
+def runDeferred():
+    """Runs the calls queued with ``maya.utils.executeDeferred``."""
+    with session._lock:
+        calls, session.deferred[:] = list( session.deferred ), []
+    for func, args in calls:
+        func( *args )
+
+
+def fireIdle():
+    """Runs the idle event script jobs once."""
+    for job, kwargs in sorted( session.jobs.items() ):
+        if 'idleEvent' in kwargs and job in session.jobs:
+            kwargs['idleEvent']()
+
+
+def fireEvent( event ):
+    """Runs the script jobs of a Maya event."""
+    for job, kwargs in sorted( session.jobs.items() ):
+        if kwargs.get( 'event', [None] )[0] == event and job in session.jobs:
+            kwargs['event'][1]()
+
+
+def createNode( name, attrs=None ):
+    session.nodes[name] = dict( attrs or {} )
+
+
+# -- command implementations
+
+def _optionVar( *args, **kwargs ):
+    values = session.optionvars
+    if 'exists' in kwargs:
+        return kwargs['exists'] in values
+    if 'query' in kwargs or 'q' in kwargs:
+        name = kwargs.get( 'query', args[0] if args else None )
+        return values.get( name, 0 )
+    if 'remove' in kwargs:
+        values.pop( kwargs['remove'], None )
+        return None
+    for flag in ( 'intValue', 'floatValue', 'stringValue', 'iv', 'fv', 'sv' ):
+        if flag in kwargs:
+            name, value = kwargs[flag]
+            values[name] = value
+    return None
+
+
+def _about( **kwargs ):
+    if 'batch' in kwargs:
+        return session.batch
+    return ''
+
+
+def _internalVar( **kwargs ):
+    return os.environ.get( 'MAYAMOCK_APPDIR', '/tmp/mayamock/' )
+
+
+def _scriptJob( *args, **kwargs ):
+    if 'exists' in kwargs:
+        return kwargs['exists'] in session.jobs
+    if 'kill' in kwargs:
+        session.jobs.pop( kwargs['kill'], None )
+        return None
+    return session.newJob( kwargs )
+
+
+def _objExists( name ):
+    node, _, attr = name.partition( '.' )
+    if node not in session.nodes:
+        return False
+    return not attr or attr in session.nodes[node]
+
+
+def _ls( *names, **kwargs ):
+    if kwargs.get( 'selection' ):
+        return list( session.selection )
+    found = []
+    for name in names:
+        for n in ( name if isinstance( name, ( list, tuple ) ) else [name] ):
+            if n in session.nodes:
+                found.append( n )
+    return found
+
+
+def _sets( name=None, **kwargs ):
+    return list( session.sets.get( name, [] ) )
+
+
+def _getAttr( name, **kwargs ):
+    node, _, attr = name.partition( '.' )
+    return session.nodes[node][attr]
+
+
+def _setAttr( name, value, **kwargs ):
+    node, _, attr = name.partition( '.' )
+    session.nodes[node][attr] = value
+
+
+def _createNode( type, name=None, **kwargs ):
+    session.nodes[name] = {}
+    return name
+
+
+def _addAttr( node, longName=None, **kwargs ):
+    session.nodes[node][longName] = None
+
+
+def _attributeQuery( attr, node=None, **kwargs ):
+    return attr in session.nodes.get( node, {} )
+
+
+def _warning( message ):
+    session.warnings.append( message )
+
+
+def _undoInfo( **kwargs ):
+    if kwargs.get( 'openChunk' ):
+        session.undo.append( kwargs.get( 'chunkName' ) )
+    elif kwargs.get( 'query' ) and kwargs.get( 'undoName' ):
+        return session.undo[-1] if session.undo else ''
+
+
+def _undo():
+    if session.undo:
+        session.undo.pop()
+
+
+_IMPLEMENTATIONS = {
+    'optionVar': _optionVar,
+    'about': _about,
+    'internalVar': _internalVar,
+    'scriptJob': _scriptJob,
+    'objExists': _objExists,
+    'ls': _ls,
+    'sets': _sets,
+    'getAttr': _getAttr,
+    'setAttr': _setAttr,
+    'createNode': _createNode,
+    'addAttr': _addAttr,
+    'attributeQuery': _attributeQuery,
+    'warning': _warning,
+    'undoInfo': _undoInfo,
+    'undo': _undo,
+}
+
+_COMMANDS = (
+    'about', 'addAttr', 'attributeQuery', 'button', 'checkBoxGrp', 'colorSliderGrp', 'columnLayout',
+    'createNode', 'deleteUI', 'file', 'fileBrowserDialog', 'fileDialog', 'floatFieldGrp', 'floatSliderGrp',
+    'formLayout', 'getAttr', 'getMelGlobal', 'intFieldGrp', 'intSliderGrp', 'internalVar', 'ls', 'menuItem',
+    'objExists', 'optionMenu', 'optionMenuGrp', 'optionVar', 'popupMenu', 'progressWindow', 'promptDialog',
+    'radioButtonGrp', 'refresh', 'repeatLast', 'rowLayout', 'runTimeCommand', 'scriptJob', 'scrollField',
+    'separator', 'setAttr', 'setParent', 'setUITemplate', 'sets', 'showWindow', 'text', 'textFieldButtonGrp',
+    'textFieldGrp', 'undo', 'undoInfo', 'warning', 'window', 'xform',
+)
+
+
+def _command( name ):
+
+    def command( *args, **kwargs ):
+        session.calls.append( ( name, args, kwargs ) )
+        handler = session.handlers.get( name ) or _IMPLEMENTATIONS.get( name )
+        if handler is not None:
+            return handler( *args, **kwargs )
+        return None
+
+    command.__name__ = name
+    return command
+
+
+class _CommandModule( types.ModuleType ):
+    """Module creating a recording command for any attribute not defined."""
+
+    def __getattr__( self, name ):
+        if name.startswith( '__' ):
+            raise AttributeError( name )
+        command = _command( name )
+        setattr( self, name, command )
+        return command
+
+
+class _Mel( object ):
+
+    def __getattr__( self, name ):
+        if name.startswith( '__' ):
+            raise AttributeError( name )
+        return _command( 'mel.' + name )
+
+
+class OptionVarDict( object ):
+    """Dict-like access to optionVars, issuing optionVar commands like pymel's."""
+
+    def __contains__( self, key ):
+        return cmds.optionVar( exists=key )
+
+    def __getitem__( self, key ):
+        if not cmds.optionVar( exists=key ):
+            raise KeyError( key )
+        return cmds.optionVar( query=key )
+
+    def __setitem__( self, key, value ):
+        flag = 'stringValue' if isinstance( value, basestring ) else 'floatValue' if isinstance( value, float ) else 'intValue'
+        cmds.optionVar( **{ flag: ( key, value ) } )
+        # -- lists are stored whole, which is all impress needs
+        session.optionvars[key] = value
+
+    def __delitem__( self, key ):
+        cmds.optionVar( remove=key )
+
+    def get( self, key, default=None ):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop( self, key, *default ):
+        value = self.get( key, *default )
+        del self[key]
+        return value
+
+
+class _Versions( types.ModuleType ):
+    v2008 = 2008
+    v2008_EXT2 = 2008.5
+    v2011 = 2011
+    v2016 = 2016
+
+    @staticmethod
+    def current():
+        return 2016
+
+
+def _executeDeferred( func, *args ):
+    with session._lock:
+        session.deferred.append( ( func, args ) )
+
+
+def _install():
+    global cmds
+
+    maya = types.ModuleType( 'maya' )
+    maya.__path__ = []
+
+    cmds = _CommandModule( 'maya.cmds' )
+    for name in _COMMANDS:
+        setattr( cmds, name, _command( name ) )
+
+    utils = types.ModuleType( 'maya.utils' )
+    utils.executeDeferred = _executeDeferred
+
+    maya.cmds = cmds
+    maya.utils = utils
+
+    pymel = types.ModuleType( 'pymel' )
+    pymel.__path__ = []
+
+    core = _CommandModule( 'pymel.core' )
+    for name in _COMMANDS:
+        setattr( core, name, _command( name ) )
+    core.optionVar = OptionVarDict()
+    core.mel = _Mel()
+    core.OptionVarList = tuple
+    core.Callback = lambda func, *args: lambda *a: func( *args )
+
+    versions = _Versions( 'pymel.versions' )
+    core.versions = versions
+
+    util = types.ModuleType( 'pymel.util' )
+    util.__path__ = []
+    path = types.ModuleType( 'pymel.util.path' )
+    path.Path = str
+
+    pymel.core = core
+    pymel.versions = versions
+    pymel.util = util
+    util.path = path
+
+    sys.modules.update( {
+        'maya': maya,
+        'maya.cmds': cmds,
+        'maya.utils': utils,
+        'pymel': pymel,
+        'pymel.core': core,
+        'pymel.versions': versions,
+        'pymel.util': util,
+        'pymel.util.path': path,
+    } )
+
+    if IMPRESS_DIR not in sys.path:
+        sys.path.insert( 0, IMPRESS_DIR )
+
+
+if 'maya.cmds' not in sys.modules:
+    _install()
+else:
+    cmds = sys.modules['maya.cmds']
@@ -0,0 +1,18 @@
+"""Commands imported by name from pipeline tests."""
+
+import models
+import register
+
+
+class StepOptions( models.OptionModel ):
+    psScale = models.FloatField( 2.0 )
+
+
+calls = []
+
+def scaleStep( psScale=2.0 ):
+    calls.append( psScale )
+    return psScale
+
+
+performScaleStep = register.PerformCommand( scaleStep, StepOptions, memoize=True )
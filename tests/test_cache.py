@@ -0,0 +1,53 @@
+import array
+import unittest
+import mayamock
+import cache
+
+
+class CacheTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+
+
+    def test_freeze_makes_values_hashable( self ):
+        frozen = cache.freeze( { 'b': [1, 2], 'a': set( [3] ), 'r': array.array( 'f', [0.5] ) } )
+
+        hash( frozen )
+        self.assertEqual( frozen, ( ( 'a', frozenset( [3] ) ), ( 'b', ( 1, 2 ) ), ( 'r', ( 0.5, ) ) ) )
+
+
+    def test_least_recently_used_are_evicted( self ):
+        results = cache.ResultCache( size=2 )
+        results.store( 'a', 1 )
+        results.store( 'b', 2 )
+        results.get( 'a' )
+        results.store( 'c', 3 )
+
+        self.assertEqual( results.get( 'a' ), 1 )
+        self.assertRaises( KeyError, results.get, 'b' )
+        self.assertEqual( ( results.hits, results.misses ), ( 2, 1 ) )
+
+
+    def test_expired_results_miss( self ):
+        results = cache.ResultCache( age=-1 )
+        results.store( 'a', 1 )
+
+        self.assertRaises( KeyError, results.get, 'a' )
+
+
+    def test_scene_change_clears( self ):
+        results = cache.ResultCache( events=( 'SceneOpened', ) )
+        results.store( 'a', 1 )
+        mayamock.fireEvent( 'SceneOpened' )
+
+        self.assertEqual( len( results ), 0 )
+
+
+    def test_fingerprint_is_part_of_key( self ):
+        results = cache.ResultCache()
+        self.assertNotEqual( results.key( { 'a': 1 }, lambda: 1 ), results.key( { 'a': 1 }, lambda: 2 ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
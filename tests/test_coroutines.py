@@ -0,0 +1,61 @@
+import unittest
+import mayamock
+import coroutines
+
+
+def double( value ):
+    return value * 2
+
+
+def fail():
+    raise ValueError( 'failed' )
+
+
+def doubleAll( values ):
+    results = yield [ coroutines.call( double, value ) for value in values ]
+    single = yield coroutines.call( double, 10 )
+    raise coroutines.Return( results + [single] )
+
+
+def failing():
+    yield coroutines.call( fail )
+
+
+class CoroutinesTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        coroutines._batch = None
+
+
+    def test_results_are_gathered_in_order( self ):
+        task = coroutines.run( doubleAll, [1, 2, 3] )
+        self.assertEqual( task.wait(), [2, 4, 6, 20] )
+
+
+    def test_exceptions_are_raised_in_the_coroutine( self ):
+        task = coroutines.run( failing )
+        self.assertRaises( ValueError, task.wait )
+
+
+    def test_completions_resume_through_deferred_calls( self ):
+        mayamock.setBatch( False )
+        done = []
+
+        task = coroutines.run( doubleAll, [1] )
+        task.addDoneCallback( done.append )
+
+        while not task.done:
+            mayamock.runDeferred()
+
+        self.assertEqual( done, [task] )
+        self.assertEqual( task.result, [2, 20] )
+
+
+    def test_generator_functions_are_coroutines( self ):
+        self.assertTrue( coroutines.iscoroutinefunction( doubleAll ) )
+        self.assertFalse( coroutines.iscoroutinefunction( double ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import mayamock
+import register
+import hotreload
+
+
+SOURCE = '''
+import models
+import register
+
+class ReloadOptions( models.OptionModel ):
+    rlSize = models.FloatField( 1.0 )
+
+def reloadTool( rlSize=1.0 ):
+    return ( %r, rlSize )
+
+performReloadTool = register.PerformCommand( reloadTool, ReloadOptions )
+'''
+
+
+class HotReloadTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        self.directory = tempfile.mkdtemp()
+        sys.path.insert( 0, self.directory )
+        self._write( 'v1' )
+
+
+    def tearDown( self ):
+        sys.path.remove( self.directory )
+        sys.modules.pop( 'reloadtools', None )
+        register.commands.pop( 'reloadtools.performReloadTool', None )
+        shutil.rmtree( self.directory )
+
+
+    def _write( self, version ):
+        for name in ( 'reloadtools.py', 'reloadtools.pyc' ):
+            path = os.path.join( self.directory, name )
+            if os.path.exists( path ):
+                os.remove( path )
+        with open( os.path.join( self.directory, 'reloadtools.py' ), 'w' ) as f:
+            f.write( SOURCE % version )
+
+
+    def test_commands_are_updated_in_place( self ):
+        import reloadtools
+        command = reloadtools.performReloadTool
+        self.assertEqual( command._run( (), { 'rlSize': 2.0 } ), ( 'v1', 2.0 ) )
+
+        self._write( 'v2' )
+        module = hotreload.reload( 'reloadtools' )
+
+        self.assertTrue( module.performReloadTool is command )
+        self.assertTrue( register.commands['reloadtools.performReloadTool'] is command )
+        self.assertEqual( command._run( (), { 'rlSize': 2.0 } ), ( 'v2', 2.0 ) )
+
+
+    def test_options_are_kept_across_reloads( self ):
+        import reloadtools
+        reloadtools.ReloadOptions().rlSize.set( 3.0 )
+
+        self._write( 'v2' )
+        module = hotreload.reload( 'reloadtools' )
+
+        self.assertEqual( module.ReloadOptions().rlSize.get(), 3.0 )
+
+
+if __name__ == '__main__':
+    unittest.main()
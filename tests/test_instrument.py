@@ -0,0 +1,93 @@
+import unittest
+import mayamock
+import maya.cmds as mc
+import pymel.core as pm
+import models
+import views
+import instrument
+
+
+class BudgetOptions( models.OptionModel ):
+    bgCount = models.IntField( 1 )
+    bgSize = models.FloatField( 1.0 )
+
+
+class InstrumentTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        instrument.reset()
+
+
+    def tearDown( self ):
+        instrument.disable()
+
+
+    def test_commands_are_counted_per_operation( self ):
+        instrument.enable()
+        with instrument.operation( 'outer' ):
+            mc.ls()
+            with instrument.operation( 'inner' ):
+                mc.ls()
+                mc.objExists( 'node' )
+
+        self.assertEqual( instrument.counts( 'outer' ), { 'ls': 2, 'objExists': 1 } )
+        self.assertEqual( instrument.counts( 'inner' ), { 'ls': 1, 'objExists': 1 } )
+
+
+    def test_option_var_dict_access_is_counted_once( self ):
+        instrument.enable()
+        with instrument.operation( 'prefs' ):
+            pm.optionVar['instrumentTest'] = 1
+            'instrumentTest' in pm.optionVar
+            pm.optionVar['instrumentTest']
+
+        self.assertEqual( instrument.counts( 'prefs' ), { 'optionVar': 3 } )
+
+
+    def test_disable_restores_commands( self ):
+        ls = mc.ls
+        getitem = type( pm.optionVar ).__dict__['__getitem__']
+
+        instrument.enable()
+        self.assertFalse( mc.ls is ls )
+        instrument.disable()
+
+        self.assertTrue( mc.ls is ls )
+        self.assertTrue( type( pm.optionVar ).__dict__['__getitem__'] is getitem )
+
+
+    def test_budget_passes_within_limit( self ):
+        with instrument.budget( 2 ):
+            mc.ls()
+            mc.ls()
+        self.assertFalse( instrument.isEnabled() )
+
+
+    def test_budget_fails_over_limit( self ):
+
+        def overBudget():
+            with instrument.budget( 1, 'overBudget' ):
+                mc.ls()
+                mc.objExists( 'node' )
+
+        self.assertRaises( AssertionError, overBudget )
+        try:
+            overBudget()
+        except AssertionError, e:
+            self.assertTrue( 'ls:1' in str( e ) and 'objExists:1' in str( e ) )
+
+
+    def test_field_change_budget( self ):
+        # -- per field: query the control, store the value, update the control
+        view = views.BaseView( BudgetOptions )
+        view._buildWidgets( 'parent' )
+
+        with instrument.budget( 6 ):
+            view._onFieldChange()
+
+        view.teardown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import json
+import array
+import shutil
+import tempfile
+import unittest
+import mayamock
+import register
+import journal
+
+
+calls = []
+
+def journaledTool( *args, **kwargs ):
+    calls.append( ( args, kwargs ) )
+
+
+runJournaledTool = register.RuntimeCommand( journaledTool, register=False )
+
+
+class JournalTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        del calls[:]
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join( self.directory, 'journal.log' )
+        register.commands[runJournaledTool.key] = runJournaledTool
+        journal.enable( self.path )
+
+
+    def tearDown( self ):
+        journal.disable()
+        shutil.rmtree( self.directory )
+
+
+    def test_invocations_are_journaled( self ):
+        runJournaledTool._invoke( 1, size=2.0 )
+        journal.disable()
+
+        entry = list( journal.read( self.path ) )[0]
+        self.assertEqual( entry['c'], runJournaledTool.key )
+        self.assertEqual( entry['a'], [1] )
+        self.assertEqual( entry['k'], { 'size': 2.0 } )
+
+
+    def test_arrays_are_replayed_as_arrays( self ):
+        runJournaledTool._invoke( ramp=array.array( 'f', [1.0, 2.0] ) )
+        journal.disable()
+        del calls[:]
+
+        journal.replay( self.path, verbose=False )
+
+        ramp = calls[0][1]['ramp']
+        self.assertTrue( isinstance( ramp, array.array ) )
+        self.assertEqual( list( ramp ), [1.0, 2.0] )
+
+
+    def test_unjournalable_entries_are_skipped( self ):
+        runJournaledTool._invoke( node=object() )
+        journal.disable()
+        del calls[:]
+
+        entry = list( journal.read( self.path ) )[0]
+        self.assertEqual( entry['u'], 1 )
+
+        timings = journal.replay( self.path, verbose=False )
+        self.assertEqual( calls, [] )
+        self.assertEqual( timings, {} )
+
+
+    def test_truncated_lines_are_skipped( self ):
+        runJournaledTool._invoke()
+        journal.disable()
+        with open( self.path, 'a' ) as f:
+            f.write( '{"c": "trunc' )
+
+        self.assertEqual( len( list( journal.read( self.path ) ) ), 1 )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import array
+import unittest
+import mayamock
+import models
+import layers
+import library
+
+
+class LayersOptions( models.OptionModel ):
+    lyWidth = models.FloatField( 1.0 )
+    lyRamp = models.ArrayField( [0.0, 1.0] )
+
+
+class LayersTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        layers.invalidate()
+        library._library = None
+        self.options = LayersOptions()
+        self.options.lyRamp._raw = None
+
+
+    def test_defaults( self ):
+        values = layers.resolve( LayersOptions )
+        self.assertEqual( values['lyWidth'], 1.0 )
+
+
+    def test_unset_array_field_resolves_to_array( self ):
+        unset = layers.resolve( LayersOptions )['lyRamp']
+
+        self.options.lyRamp.set( [2.0, 3.0] )
+        layers.invalidate( LayersOptions )
+        stored = layers.resolve( LayersOptions )['lyRamp']
+
+        self.assertEqual( type( unset ), type( stored ) )
+        self.assertTrue( isinstance( unset, array.array ) )
+
+
+    def test_stored_scene_and_kwargs_layers( self ):
+        self.options.lyWidth.set( 2.0 )
+        self.assertEqual( layers.resolve( LayersOptions )['lyWidth'], 2.0 )
+
+        layers.setSceneOverrides( LayersOptions, { 'lyWidth': 3.0 } )
+        self.assertEqual( layers.resolve( LayersOptions )['lyWidth'], 3.0 )
+
+        self.assertEqual( layers.resolve( LayersOptions, lyWidth=4.0 )['lyWidth'], 4.0 )
+
+
+    def test_stored_change_invalidates_cache( self ):
+        layers.resolve( LayersOptions )
+        self.options.lyWidth.set( 5.0 )
+
+        self.assertEqual( layers.resolve( LayersOptions )['lyWidth'], 5.0 )
+
+
+if __name__ == '__main__':
+    unittest.main()
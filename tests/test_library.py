@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+import mayamock
+import scheduler
+import library
+
+
+class LibraryTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        scheduler._queue[:] = []
+        scheduler._batch = None
+        self.root = tempfile.mkdtemp()
+        self.cache_path = os.path.join( self.root, 'cache', 'library.cache' )
+        self.library = library.PresetLibrary( self.root, self.cache_path )
+
+
+    def tearDown( self ):
+        shutil.rmtree( self.root )
+
+
+    def _write( self, name, text ):
+        with open( os.path.join( self.root, name ), 'w' ) as f:
+            f.write( text )
+
+
+    def test_publish_and_read( self ):
+        self.library.publish( 'Options', 'soft', { 'size': 1.0 } )
+
+        self.assertEqual( self.library.presets( 'Options' ), ['soft'] )
+        self.assertEqual( self.library.getPreset( 'Options', 'soft' ), { 'size': 1.0 } )
+        self.assertEqual( self.library.models(), ['Options'] )
+        self.assertEqual( sorted( os.listdir( self.root ) ), ['Options.json', 'cache', 'index.json'] )
+
+
+    def test_missing_files_are_not_cached( self ):
+        self.assertEqual( self.library.presets( 'Options' ), [] )
+        self.assertFalse( 'Options' in self.library._loadCache() )
+
+        self._write( 'Options.json', '{"hard": {"size": 2.0}}' )
+        self.assertEqual( self.library.presets( 'Options' ), ['hard'] )
+
+
+    def test_corrupt_files_warn_and_are_retried( self ):
+        self._write( 'Options.json', '{"hard": ' )
+
+        self.assertEqual( self.library.presets( 'Options' ), [] )
+        self.assertEqual( len( mayamock.session.warnings ), 1 )
+
+        self._write( 'Options.json', '{"hard": {}}' )
+        self.assertEqual( self.library.presets( 'Options' ), ['hard'] )
+
+
+    def test_cache_is_reused_by_new_sessions( self ):
+        self._write( 'Options.json', '{"hard": {}}' )
+        self.library.presets( 'Options' )
+        self.library.saveCache()
+
+        reopened = library.PresetLibrary( self.root, self.cache_path )
+        self.assertTrue( 'Options' in reopened._loadCache() )
+
+
+    def test_written_files_are_readable_by_others( self ):
+        self.library.publish( 'Options', 'soft', {} )
+
+        mode = os.stat( os.path.join( self.root, 'index.json' ) ).st_mode & 0777
+        self.assertEqual( mode, 0666 & ~library._umask )
+        self.assertEqual( [ name for name in os.listdir( self.root ) if name.endswith( '.tmp' ) ], [] )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import array
+import unittest
+import mayamock
+import models
+
+
+class ModelsOptions( models.OptionModel ):
+    mdCount = models.IntField( 2, minValue=0 )
+    mdMode = models.OptionMenu( 1, labels=['a', 'b'] )
+    mdRamp = models.ArrayField( [0.0, 0.5, 1.0] )
+
+
+class ModelsTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        self.options = ModelsOptions()
+        for field in self.options.fields:
+            field._validated = False
+            if hasattr( field, '_raw' ):
+                field._raw = None
+
+
+    def test_option_menu_default_is_positional( self ):
+        self.assertEqual( ModelsOptions.mdMode.default, 1 )
+        self.assertTrue( ModelsOptions.mdMode.lazy )
+
+
+    def test_get_returns_default_until_set( self ):
+        self.assertEqual( self.options.mdCount.get(), 2 )
+        self.options.mdCount.set( 5 )
+        self.assertEqual( self.options.mdCount.get(), 5 )
+
+
+    def test_set_rejects_values_outside_limits( self ):
+        self.assertRaises( ValueError, self.options.mdCount.set, -1 )
+
+
+    def test_invalid_stored_value_is_reset_on_first_get( self ):
+        mayamock.session.optionvars[ModelsOptions.mdCount.varname] = -4
+
+        self.assertEqual( self.options.mdCount.get(), 2 )
+        self.assertEqual( mayamock.session.optionvars[ModelsOptions.mdCount.varname], 2 )
+
+
+    def test_get_queries_existence_once( self ):
+        self.options.mdCount.set( 3 )
+        self.options.mdCount.get()
+        del mayamock.session.calls[:]
+
+        self.options.mdCount.get()
+
+        queries = [ kwargs for name, args, kwargs in mayamock.session.calls if name == 'optionVar' ]
+        self.assertEqual( len( [ q for q in queries if 'exists' in q ] ), 1 )
+
+
+    def test_array_field_returns_arrays_set_or_not( self ):
+        ramp = self.options.mdRamp
+
+        self.assertTrue( isinstance( ramp.get(), array.array ) )
+        self.assertTrue( isinstance( ramp.getDefault(), array.array ) )
+
+        ramp.set( [1.0, 2.0] )
+        self.assertEqual( list( ramp.get() ), [1.0, 2.0] )
+        self.assertTrue( isinstance( ramp.get(), array.array ) )
+
+
+    def test_presets_store_arrays_as_lists( self ):
+        self.options.mdRamp.set( [0.25] )
+        self.options.savePreset( 'quarter' )
+
+        preset = self.options.getPreset( 'quarter' )
+        self.assertEqual( preset['mdRamp'], [0.25] )
+        self.assertTrue( isinstance( preset['mdCount'], int ) )
+        self.assertTrue( isinstance( preset['mdRamp'], list ) )
+
+
+    def test_normalize_converts_arrays( self ):
+        self.assertEqual( models._normalize( array.array( 'i', [1, 2] ) ), [1, 2] )
+        self.assertEqual( models._normalize( ( 1, ( 2, 3 ) ) ), [1, [2, 3]] )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import mayamock
+import profiler
+
+
+@profiler.traced( 'test' )
+def tracedWork():
+    return 'done'
+
+
+class ProfilerTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join( self.directory, 'trace', 'startup.json' )
+
+
+    def tearDown( self ):
+        profiler.disable()
+        shutil.rmtree( self.directory )
+
+
+    def test_disabled_spans_record_nothing( self ):
+        with profiler.span( 'quiet' ):
+            pass
+        self.assertEqual( tracedWork(), 'done' )
+        self.assertEqual( profiler.summarize(), [] )
+
+
+    def test_spans_and_imports_are_saved_as_a_trace( self ):
+        profiler.enable( self.path )
+        with profiler.span( 'outer', 'test', detail=1 ):
+            tracedWork()
+        __import__( 'wave' )
+        profiler.disable()
+
+        with open( self.path ) as f:
+            events = json.load( f )['traceEvents']
+
+        names = [ event['name'] for event in events ]
+        self.assertTrue( 'outer' in names )
+        self.assertTrue( 'tracedWork' in names )
+        self.assertTrue( 'wave' in names )
+        self.assertEqual( [ event['args'] for event in events if event['name'] == 'outer' ], [ { 'detail': 1 } ] )
+
+
+    def test_summarize_totals_by_name( self ):
+        profiler.enable()
+        for i in range( 3 ):
+            with profiler.span( 'repeated', 'test' ):
+                pass
+
+        self.assertEqual( [ ( name, count ) for name, total, count in profiler.summarize( 'test' ) ], [ ( 'repeated', 3 ) ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
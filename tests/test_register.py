@@ -0,0 +1,57 @@
+import sys
+import unittest
+import mayamock
+import register
+
+
+class RegisterTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        sys.modules.pop( 'pipelinesteps', None )
+        for key in list( register.commands ):
+            if key.startswith( 'pipelinesteps.' ):
+                del register.commands[key]
+
+
+    def test_get_command_imports_module( self ):
+        command = register.getCommand( 'pipelinesteps.performScaleStep' )
+        self.assertEqual( command.key, 'pipelinesteps.performScaleStep' )
+        self.assertRaises( KeyError, register.getCommand, 'pipelinesteps.missing' )
+
+
+    def test_pipeline_imports_string_steps_when_run( self ):
+        pipeline = register.Pipeline( ['pipelinesteps.performScaleStep'], name='scalePipeline', register=False )
+        self.assertFalse( 'pipelinesteps' in sys.modules )
+
+        self.assertEqual( pipeline.run(), [2.0] )
+
+
+    def test_pipeline_steps_use_kwargs_and_result_cache( self ):
+        pipeline = register.Pipeline( [
+            'pipelinesteps.performScaleStep',
+            ( 'pipelinesteps.performScaleStep', { 'psScale': 3.0 } ),
+        ], name='scalePipeline', register=False )
+
+        self.assertEqual( pipeline.run(), [2.0, 3.0] )
+        self.assertEqual( pipeline.run(), [2.0, 3.0] )
+
+        import pipelinesteps
+        self.assertEqual( pipelinesteps.calls, [2.0, 3.0] )
+
+
+    def test_invoke_callbacks_see_pipeline_steps( self ):
+        reported = []
+        callback = lambda command, args, kwargs, duration, exc_info: reported.append( ( command.key, args, kwargs ) )
+        register.addInvokeCallback( callback )
+        try:
+            pipeline = register.Pipeline( ['pipelinesteps.performScaleStep'], name='scalePipeline', register=False )
+            pipeline.run()
+        finally:
+            register.removeInvokeCallback( callback )
+
+        self.assertEqual( reported, [ ( 'pipelinesteps.performScaleStep', (), { 'psScale': 2.0 } ) ] )
+
+
+if __name__ == '__main__':
+    unittest.main()
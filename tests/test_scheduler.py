@@ -0,0 +1,102 @@
+import time
+import unittest
+import mayamock
+import scheduler
+
+
+class SchedulerTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        scheduler._queue[:] = []
+        scheduler._job = None
+        scheduler._cancelTimer()
+        scheduler._batch = None
+
+
+    def tearDown( self ):
+        scheduler._cancelTimer()
+
+
+    def test_batch_runs_by_priority( self ):
+        order = []
+        scheduler._draining = True
+        try:
+            scheduler.schedule( lambda: order.append( 'low' ), scheduler.LOW )
+            scheduler.schedule( lambda: order.append( 'high' ), scheduler.HIGH )
+        finally:
+            scheduler._draining = False
+        scheduler.drain()
+
+        self.assertEqual( order, ['high', 'low'] )
+
+
+    def test_generators_are_stepped( self ):
+        steps = []
+
+        def work():
+            for i in range( 3 ):
+                steps.append( i )
+                yield
+
+        task = scheduler.schedule( work() )
+
+        self.assertEqual( steps, [0, 1, 2] )
+        self.assertTrue( task.done )
+        self.assertEqual( task.steps, 4 )
+
+
+    def test_cancelled_tasks_do_not_run( self ):
+        mayamock.setBatch( False )
+        ran = []
+        task = scheduler.schedule( lambda: ran.append( 1 ) )
+        task.cancel()
+        mayamock.fireIdle()
+
+        self.assertEqual( ran, [] )
+        self.assertEqual( scheduler.stats()['queued'], 0 )
+        self.assertIsNone( scheduler._job )
+
+
+    def test_idle_job_stops_while_tasks_sleep( self ):
+        mayamock.setBatch( False )
+        steps = []
+
+        def work():
+            steps.append( 'first' )
+            yield 0.05
+            steps.append( 'second' )
+
+        scheduler.schedule( work() )
+        self.assertIsNotNone( scheduler._job )
+
+        mayamock.fireIdle()
+        self.assertEqual( steps, ['first'] )
+        self.assertIsNone( scheduler._job )
+        self.assertIsNotNone( scheduler._timer )
+
+        time.sleep( 0.1 )
+        mayamock.runDeferred()
+        self.assertIsNotNone( scheduler._job )
+
+        mayamock.fireIdle()
+        self.assertEqual( steps, ['first', 'second'] )
+        self.assertIsNone( scheduler._job )
+
+
+    def test_scheduling_cancels_wake_timer( self ):
+        mayamock.setBatch( False )
+
+        def sleeper():
+            yield 10
+        scheduler.schedule( sleeper() )
+        mayamock.fireIdle()
+        self.assertIsNotNone( scheduler._timer )
+
+        scheduler.schedule( lambda: None )
+        self.assertIsNone( scheduler._timer )
+        self.assertIsNotNone( scheduler._job )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import mayamock
+import selection
+
+
+class SelectionTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        for name in ( 'pCube1', 'pCube2', 'pSphere1' ):
+            mayamock.createNode( name )
+
+
+    def test_sources( self ):
+        mayamock.session.selection = ['pCube1']
+        mayamock.session.sets['rigSet'] = ['pCube2', 'pSphere1']
+        mayamock.createNode( 'rigSet' )
+
+        self.assertEqual( selection.resolve( selection.SELECTION ), ( 'pCube1', ) )
+        self.assertEqual( selection.resolve( selection.SET_PREFIX + 'rigSet' ), ( 'pCube2', 'pSphere1' ) )
+        self.assertEqual( selection.resolve( selection.nodesSource( ['pSphere1', 'missing'] ) ), ( 'pSphere1', ) )
+        self.assertEqual( selection.resolve( selection.SET_PREFIX + 'missingSet' ), () )
+        self.assertRaises( ValueError, selection.resolve, 'bogus' )
+
+
+    def test_snapshot_reuses_results( self ):
+        mayamock.session.selection = ['pCube1']
+
+        with selection.snapshot():
+            first = selection.resolve( selection.SELECTION )
+            mayamock.session.selection = ['pCube2']
+            self.assertEqual( selection.resolve( selection.SELECTION ), first )
+
+        self.assertEqual( selection.resolve( selection.SELECTION ), ( 'pCube2', ) )
+
+
+if __name__ == '__main__':
+    unittest.main()
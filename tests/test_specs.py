@@ -0,0 +1,67 @@
+import unittest
+import mayamock
+import models
+import specs
+import views
+
+
+class SpecOptions( models.OptionModel ):
+    spEnabled = models.CheckBox( True )
+    spSize = models.FloatField( 1.0, requires=( spEnabled, True ) )
+
+    class Meta:
+        title = 'Spec Test'
+
+
+class LegacyField( models.CheckBox ):
+
+    built = None
+
+    def buildWidget( self, **kwargs ):
+        LegacyField.built = kwargs
+
+
+class LegacyOptions( models.OptionModel ):
+    spLegacy = LegacyField( False )
+
+
+class SpecsTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        specs._specs.clear()
+
+
+    def test_specs_are_compiled_once_per_model( self ):
+        spec = specs.compileSpec( SpecOptions )
+
+        self.assertTrue( specs.compileSpec( SpecOptions() ) is spec )
+        self.assertEqual( spec.title, 'Spec Test' )
+        self.assertEqual( [ field.name for field in spec ], ['spEnabled', 'spSize'] )
+        self.assertEqual( [ dependent.name for dependent in spec.dependents['spEnabled'] ], ['spSize'] )
+
+
+    def test_none_has_an_empty_spec( self ):
+        spec = specs.compileSpec( None )
+
+        self.assertEqual( spec.fields, [] )
+        self.assertIsNone( spec.model_class )
+
+
+    def test_view_without_model( self ):
+        view = views.BaseView( None )
+        self.assertEqual( view.spec.fields, [] )
+        view.teardown()
+
+
+    def test_build_widget_overrides_taking_only_kwargs( self ):
+        view = views.BaseView( LegacyOptions )
+        view._buildWidgets( 'parent' )
+
+        self.assertTrue( 'spec' in LegacyField.built )
+        self.assertTrue( 'changeCommand' in LegacyField.built )
+        view.teardown()
+
+
+if __name__ == '__main__':
+    unittest.main()
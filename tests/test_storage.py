@@ -0,0 +1,76 @@
+import json
+import unittest
+import mayamock
+import models
+import storage
+import scheduler
+
+
+class BlobOptions( models.OptionModel ):
+    stShared = models.FloatField( 1.0 )
+    stOwn = models.FloatField( 1.0 )
+    stNamed = models.IntField( 0, varname='BlobOptions_legacyNamed' )
+
+    class Meta:
+        storage = 'blob'
+
+
+class SharingOptions( models.OptionModel ):
+    stShared = models.FloatField( 2.0 )
+
+
+class StorageTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        storage._stores.clear()
+        scheduler._queue[:] = []
+        scheduler._job = None
+        scheduler._batch = None
+        for field in BlobOptions.__dict__.itervalues():
+            if isinstance( field, models.OptionField ):
+                field._validated = False
+
+
+    def test_migration_keeps_only_shared_optionvars( self ):
+        optionvars = mayamock.session.optionvars
+        optionvars['FloatField_stShared'] = 3.0
+        optionvars['FloatField_stOwn'] = 4.0
+        optionvars['BlobOptions_legacyNamed'] = 5
+
+        options = BlobOptions()
+
+        self.assertEqual( options.stShared.get(), 3.0 )
+        self.assertEqual( options.stOwn.get(), 4.0 )
+        self.assertEqual( options.stNamed.get(), 5 )
+
+        self.assertTrue( 'FloatField_stShared' in optionvars )
+        self.assertFalse( 'FloatField_stOwn' in optionvars )
+        self.assertFalse( 'BlobOptions_legacyNamed' in optionvars )
+        self.assertIsNone( SharingOptions.stShared._varname )
+
+
+    def test_values_are_flushed_as_one_blob( self ):
+        mayamock.setBatch( False )
+        scheduler._batch = None
+        options = BlobOptions()
+        options.stOwn.set( 6.0 )
+        options.stNamed.set( 7 )
+
+        self.assertFalse( 'BlobOptions_options' in mayamock.session.optionvars )
+        scheduler.drain()
+
+        blob = json.loads( mayamock.session.optionvars['BlobOptions_options'] )
+        self.assertEqual( blob['version'], storage.VERSION )
+        self.assertEqual( blob['values'], { 'stOwn': 6.0, 'stNamed': 7 } )
+
+
+    def test_corrupt_blob_uses_defaults( self ):
+        mayamock.session.optionvars['BlobOptions_options'] = '{"version": 1'
+
+        self.assertEqual( BlobOptions().stOwn.get(), 1.0 )
+        self.assertEqual( len( mayamock.session.warnings ), 1 )
+
+
+if __name__ == '__main__':
+    unittest.main()
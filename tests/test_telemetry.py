@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+import mayamock
+import telemetry
+
+
+class TelemetryTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join( self.directory, 'telemetry.bin' )
+
+
+    def tearDown( self ):
+        shutil.rmtree( self.directory )
+
+
+    def test_ring_buffer_keeps_newest_records( self ):
+        ring = telemetry.RingBuffer( self.path, capacity=3 )
+        ring.append( [ ( 'cmd', float( i ), 0.1, True ) for i in range( 5 ) ] )
+
+        self.assertEqual( [ record[1] for record in ring.read() ], [2.0, 3.0, 4.0] )
+        self.assertEqual( os.path.getsize( self.path ), telemetry._HEADER.size + 3 * telemetry._RECORD.size )
+
+
+    def test_long_keys_are_cut_on_a_character_boundary( self ):
+        ring = telemetry.RingBuffer( self.path )
+        ring.append( [ ( u'a' * 63 + u'\xe9', 0.0, 0.1, True ) ] )
+
+        self.assertEqual( ring.read()[0][0], u'a' * 63 )
+
+
+    def test_concurrent_processes_do_not_lose_records( self ):
+        if not hasattr( os, 'fork' ):
+            self.skipTest( 'requires fork' )
+
+        pids = []
+        for i in range( 4 ):
+            pid = os.fork()
+            if pid == 0:
+                ring = telemetry.RingBuffer( self.path, capacity=1000 )
+                for j in range( 25 ):
+                    ring.append( [ ( 'cmd%d' % i, float( j ), 0.1, True ) ] )
+                os._exit( 0 )
+            pids.append( pid )
+
+        for pid in pids:
+            os.waitpid( pid, 0 )
+
+        summary = telemetry.aggregate( [ self.path ] )
+        self.assertEqual( [ summary['cmd%d' % i]['count'] for i in range( 4 ) ], [25] * 4 )
+
+
+    def test_summarize( self ):
+        records = [ ( 'cmd', 0.0, duration, duration < 0.9 ) for duration in ( 0.1, 0.2, 1.0 ) ]
+        summary = telemetry.summarize( records )['cmd']
+
+        self.assertEqual( summary['count'], 3 )
+        self.assertEqual( summary['failures'], 1 )
+        self.assertEqual( summary['p50'], 0.2 )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import gc
+import unittest
+import mayamock
+import models
+import register
+import views
+
+
+class ViewOptions( models.OptionModel ):
+    vwCount = models.IntField( 1, minValue=0 )
+    vwSize = models.FloatField( 1.0 )
+
+    class Meta:
+        live_preview = True
+
+
+calls = []
+
+def viewTool( vwCount=1, vwSize=1.0 ):
+    calls.append( ( vwCount, vwSize ) )
+
+
+performViewTool = register.PerformCommand( viewTool, ViewOptions )
+
+
+class ViewsTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+        del calls[:]
+        for view in list( views._open_views ):
+            view.teardown()
+
+
+    def test_shown_views_stay_alive_until_teardown( self ):
+        views.OptionBoxView( ViewOptions, performViewTool ).show()
+        gc.collect()
+
+        self.assertEqual( views.stats()['open_views'], 1 )
+        view = list( views._open_views )[0]
+
+        view.teardown()
+        del view
+        gc.collect()
+        self.assertEqual( views.stats()['open_views'], 0 )
+        self.assertEqual( views.stats()['views'], 0 )
+
+
+    def test_invalid_control_value_only_skips_its_field( self ):
+        view = views.BaseView( ViewOptions )
+        widget_values = { 'vwCount': -1, 'vwSize': 4.0 }
+        for field in view.optionmodel.fields:
+            field.getWidgetValue = lambda field=field: widget_values[field.name]
+
+        view._updateOptions()
+
+        self.assertEqual( view.optionmodel.vwSize.get(), 4.0 )
+        self.assertEqual( view.optionmodel.vwCount.get(), 1 )
+        view.teardown()
+
+
+    def test_preview_callback_is_reused( self ):
+        view = views.OptionBoxView( ViewOptions, performViewTool )
+        count = len( view._callbacks )
+
+        view._schedulePreview()
+        view._preview_pending = False
+        view._schedulePreview()
+
+        self.assertEqual( len( view._callbacks ), count )
+        view.teardown()
+
+
+    def test_committed_preview_is_reported_once( self ):
+        reported = []
+        callback = lambda command, args, kwargs, duration, exc_info: reported.append( kwargs )
+        register.addInvokeCallback( callback )
+        try:
+            view = views.OptionBoxView( ViewOptions, performViewTool )
+            view._preview_pending = True
+            view._runPreview()
+            self.assertEqual( reported, [] )
+
+            self.assertTrue( view._commitPreview() )
+            self.assertEqual( len( reported ), 1 )
+            self.assertEqual( len( calls ), 1 )
+        finally:
+            register.removeInvokeCallback( callback )
+            view.teardown()
+
+
+if __name__ == '__main__':
+    unittest.main()
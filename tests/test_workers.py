@@ -0,0 +1,63 @@
+import unittest
+import mayamock
+import workers
+
+
+def square( chunk ):
+    return [ item * item for item in chunk ]
+
+
+def explode( chunk ):
+    raise ValueError( 'bad chunk' )
+
+
+def collect( results, count=0 ):
+    return results
+
+
+def gather( count=0 ):
+    return range( count )
+
+
+class WorkersTestCase( unittest.TestCase ):
+
+    def setUp( self ):
+        mayamock.reset()
+
+
+    def tearDown( self ):
+        workers._discardProcessPool()
+
+
+    def test_threads_are_the_default( self ):
+        function = workers.phased( compute=square, apply=collect )( gather )
+
+        self.assertFalse( function.processes )
+        self.assertEqual( function( count=6 ), [0, 1, 4, 9, 16, 25] )
+        self.assertIsNone( workers._process_pool )
+
+
+    def test_process_pool_is_reused( self ):
+        function = workers.PhasedFunction( gather, square, collect, chunk_size=2, processes=True )
+
+        self.assertEqual( function.run( count=5 ), [0, 1, 4, 9, 16] )
+        pool = workers._process_pool
+        function.run( count=5 )
+        self.assertTrue( workers._process_pool is pool )
+
+
+    def test_failed_compute_discards_process_pool( self ):
+        workers.PhasedFunction( gather, square, collect, processes=True ).run( count=2 )
+        function = workers.PhasedFunction( gather, explode, collect, processes=True )
+
+        self.assertRaises( ValueError, function.run, count=4 )
+        self.assertIsNone( workers._process_pool )
+
+
+    def test_chunks_cover_all_items( self ):
+        function = workers.PhasedFunction( gather, square, collect, chunk_size=4 )
+        self.assertEqual( [ len( chunk ) for chunk in function._chunks( range( 10 ) ) ], [4, 4, 2] )
+
+
+if __name__ == '__main__':
+    unittest.main()